@@ -1,12 +1,82 @@
 #Author-Wayne Brill
 #Description-Allows you to select a CSV (comma seperated values) file and then edits existing Attributes. Also allows you to write parameters to a file
 
-import adsk.core, adsk.fusion, traceback, csv
+import adsk.core, adsk.fusion, traceback, logging, os, tempfile, time
+
+# the I/O engine in paramio is imported by loadEngine the first time a
+# command runs, Fusion only has to load this file when it starts
+batch = cache = designtable = engine = fusion = incremental = preview = snapshot = timing = validate = watcher = None
 
 commandId = 'ParamsFromCSV'
-workspaceToUse = 'FusionSolidEnvironment'
+batchCommandId = 'ParamsBatchFromManifest'
+designTableCommandId = 'ParamsFromDesignTable'
 panelToUse = 'SolidModifyPanel'
 
+# run() logs how long the add-in took to start and warns when it took longer
+# than startupBudget seconds
+startupBudget = 0.05
+
+# defer the model compute while importing so Fusion recomputes once at the end
+# instead of after every parameter that is added or changed
+deferComputeOnImport = True
+
+# check the file against the design before changing anything, and ask
+# before importing a file with unit conflicts or expressions that won't evaluate
+previewBeforeImport = True
+
+# check every row of a CSV file has a legal unique name and an expression that
+# parses before anything is imported, units that are not known are warned
+# about. All problems and warnings found are written to <file>_errors.csv.
+# The check runs in Fusion's process: worker processes started from Fusion
+# would run Fusion itself and could not import the add-in, the process pool
+# of paramio.validate is for scripts run outside
+validateBeforeImport = True
+validateWorkers = 0
+validateChunkRows = 20000
+
+# save and close the documents a batch had to open after updating them
+saveBatchDocuments = True
+
+# parsed parameter files are kept for the session, with writeCacheSidecars the
+# parsed rows are also saved next to the CSV files for the next session
+writeCacheSidecars = False
+tableCache = None
+
+# with incrementalExport, exporting to a file that was exported to before only
+# merges the parameters that changed into it, keeping the order of its rows and
+# columns users added, and leaves it alone when nothing changed
+incrementalExport = False
+exporter = None
+
+# with liveSync the file last imported or exported by the command stays bound to
+# the design, unless the import was refused: parameter edits are exported to it in the background once they
+# have settled for liveSyncDebounce seconds, and changes made to the file on
+# disk are imported, at most once every liveSyncMinImportInterval seconds
+liveSync = False
+liveSyncDebounce = 2.0
+liveSyncMinImportInterval = 10.0
+liveSyncEventId = 'ParameterIOLiveSync'
+# the commands that make live sync look for parameter changes when they
+# complete, reading the parameters after every command would slow Fusion
+# down. Add the ids of other commands that change parameters you want
+# exported, None looks after every completed command.
+liveSyncCommandIds = ('ChangeParameterCommand', 'UndoCommand', 'RedoCommand', commandId, batchCommandId, designTableCommandId)
+sync = None
+syncDesign = None
+syncHandlers = []
+
+# the add-in logs to the text commands window and to logFile (None for no
+# log file), logging.DEBUG logs every parameter set by an import. logFile
+# always gets the INFO messages, like the time the add-in took to start
+logLevel = logging.WARNING
+logFile = os.path.join(tempfile.gettempdir(), 'ParameterIO.log')
+logHandlers = []
+
+# the timing of every import and export is appended to this file as a line of
+# JSON, None switches that off. showTimingSummary adds it to the finish message
+timingLogFile = os.path.join(tempfile.gettempdir(), 'ParameterIO_timing.jsonl')
+showTimingSummary = True
+
 # global set of event handlers to keep them referenced for the duration of the command
 handlers = []
 
@@ -26,10 +96,7 @@ def commandControlByIdForPanel(id):
     if not id:
         ui.messageBox('commandControl id is not specified')
         return None
-    workspaces_ = ui.workspaces
-    modelingWorkspace_ = workspaces_.itemById(workspaceToUse)
-    toolbarPanels_ = modelingWorkspace_.toolbarPanels
-    toolbarPanel_ = toolbarPanels_.itemById(panelToUse)
+    toolbarPanel_ = ui.allToolbarPanels.itemById(panelToUse)
     toolbarControls_ = toolbarPanel_.controls
     toolbarControl_ = toolbarControls_.itemById(id)
     return toolbarControl_
@@ -41,78 +108,94 @@ def destroyObject(uiObj, tobeDeleteObj):
         else:
             uiObj.messageBox('tobeDeleteObj is not a valid object')
 
+def loadEngine():
+    global batch, cache, designtable, engine, fusion, incremental, preview, snapshot, timing, validate, watcher
+    global tableCache, exporter
+    if engine is not None:
+        return
+    from .paramio import batch, cache, designtable, engine, fusion, incremental, preview, snapshot, timing, validate, watcher
+    tableCache = cache.TableCache(sidecar=writeCacheSidecars)
+    exporter = incremental.IncrementalExporter()
+
+class CommandExecuteHandler(adsk.core.CommandEventHandler):
+    def __init__(self, executeFunction):
+        super().__init__()
+        self.executeFunction = executeFunction
+    def notify(self, args):
+        try:
+            loadEngine()
+            self.executeFunction()
+        except:
+            ui = adsk.core.Application.get().userInterface
+            if ui:
+                ui.messageBox('command executed failed:\n{}'.format(traceback.format_exc()))
+
+class CommandCreatedEventHandlerPanel(adsk.core.CommandCreatedEventHandler):
+    def __init__(self, executeFunction):
+        super().__init__()
+        self.executeFunction = executeFunction
+    def notify(self, args):
+        try:
+            cmd = args.command
+            onExecute = CommandExecuteHandler(self.executeFunction)
+            cmd.execute.add(onExecute)
+            # keep the handler referenced beyond this function
+            handlers.append(onExecute)
+
+        except:
+            ui = adsk.core.Application.get().userInterface
+            if ui:
+                ui.messageBox('Panel command created failed:\n{}'.format(traceback.format_exc()))
+
 def run(context):
     ui = None
     try:
-        commandName = 'Import/Export Parameters (CSV)'
-        commandDescription = 'Import parameters from or export them to a CSV (Comma Separated Values) file\n'
+        started = time.perf_counter()
+        startLogging()
         commandResources = './resources/command'
+        commands = [
+            (commandId, 'Import/Export Parameters (CSV)',
+             'Import parameters from or export them to a CSV (Comma Separated Values) file\n',
+             updateParamsFromCSV),
+            (batchCommandId, 'Batch Import/Export Parameters (CSV)',
+             'Import parameters into or export them from every design listed in a manifest CSV file\n',
+             updateParamsFromManifest),
+            (designTableCommandId, 'Design Table Parameters (CSV)',
+             'Apply configurations from a design table CSV file with one column per configuration, or add the current parameters to one as a new configuration\n',
+             updateParamsFromDesignTable)]
 
         app = adsk.core.Application.get()
         ui = app.userInterface
 
-        class CommandExecuteHandler(adsk.core.CommandEventHandler):
-            def __init__(self):
-                super().__init__()
-            def notify(self, args):
-                try:
-                  updateParamsFromCSV()
-                except:
-                    if ui:
-                        ui.messageBox('command executed failed:\n{}'.format(traceback.format_exc()))
-
-        class CommandCreatedEventHandlerPanel(adsk.core.CommandCreatedEventHandler):
-            def __init__(self):
-                super().__init__() 
-            def notify(self, args):
-                try:
-                    cmd = args.command
-                    onExecute = CommandExecuteHandler()
-                    cmd.execute.add(onExecute)
-                    # keep the handler referenced beyond this function
-                    handlers.append(onExecute)
-
-                except:
-                    if ui:
-                        ui.messageBox('Panel command created failed:\n{}'.format(traceback.format_exc()))
-
-        class CommandCreatedEventHandlerQAT(adsk.core.CommandCreatedEventHandler):
-            def __init__(self):
-                super().__init__()
-            def notify(self, args):
-                try:
-                    command = args.command
-                    onExecute = CommandExecuteHandler()
-                    command.execute.add(onExecute)
-                    # keep the handler referenced beyond this function
-                    handlers.append(onExecute)
-
-                except:
-                    ui.messageBox('QAT command created failed:\n{}'.format(traceback.format_exc()))
-
         commandDefinitions_ = ui.commandDefinitions
 
-		# check if we have the command definition
-        commandDefinition_ = commandDefinitions_.itemById(commandId)
-        if not commandDefinition_:
-            commandDefinition_ = commandDefinitions_.addButtonDefinition(commandId, commandName, commandDescription, commandResources)		 
-
-        onCommandCreated = CommandCreatedEventHandlerPanel()
-        commandDefinition_.commandCreated.add(onCommandCreated)
-        # keep the handler referenced beyond this function
-        handlers.append(onCommandCreated)
-        
-        # add a command on create panel in modeling workspace
-        workspaces_ = ui.workspaces
-        modelingWorkspace_ = workspaces_.itemById(workspaceToUse)
-        toolbarPanels_ = modelingWorkspace_.toolbarPanels
-        toolbarPanel_ = toolbarPanels_.itemById(panelToUse) 
-        toolbarControlsPanel_ = toolbarPanel_.controls
-        toolbarControlPanel_ = toolbarControlsPanel_.itemById(commandId)
-        if not toolbarControlPanel_:
-            toolbarControlPanel_ = toolbarControlsPanel_.addCommand(commandDefinition_, '')
-            toolbarControlPanel_.isVisible = True
-            #ui.messageBox('A CSV command is successfully added to the create panel in modeling workspace')
+        # add the commands on the modify panel in modeling workspace
+        toolbarControlsPanel_ = ui.allToolbarPanels.itemById(panelToUse).controls
+
+        for id, commandName, commandDescription, executeFunction in commands:
+            # check if we have the command definition
+            commandDefinition_ = commandDefinitions_.itemById(id)
+            if not commandDefinition_:
+                commandDefinition_ = commandDefinitions_.addButtonDefinition(id, commandName, commandDescription, commandResources)
+
+            onCommandCreated = CommandCreatedEventHandlerPanel(executeFunction)
+            commandDefinition_.commandCreated.add(onCommandCreated)
+            # keep the handler referenced beyond this function
+            handlers.append(onCommandCreated)
+
+            toolbarControlPanel_ = toolbarControlsPanel_.itemById(id)
+            if not toolbarControlPanel_:
+                toolbarControlPanel_ = toolbarControlsPanel_.addCommand(commandDefinition_, '')
+                toolbarControlPanel_.isVisible = True
+
+        if liveSync:
+            startLiveSync(app)
+
+        elapsed = time.perf_counter() - started
+        if elapsed > startupBudget:
+            logging.getLogger(__name__).warning('Started in %.1f ms, over the budget of %.1f ms', elapsed * 1000, startupBudget * 1000)
+        else:
+            logging.getLogger(__name__).info('Started in %.1f ms, the budget is %.1f ms', elapsed * 1000, startupBudget * 1000)
 
     except:
         if ui:
@@ -125,21 +208,52 @@ def stop(context):
         ui = app.userInterface
         objArray = []
 
-        commandControlPanel_ = commandControlByIdForPanel(commandId)
-        if commandControlPanel_:
-            objArray.append(commandControlPanel_)
-            
-        commandDefinition_ = commandDefinitionById(commandId)
-        if commandDefinition_:
-            objArray.append(commandDefinition_)
+        for id in (commandId, batchCommandId, designTableCommandId):
+            commandControlPanel_ = commandControlByIdForPanel(id)
+            if commandControlPanel_:
+                objArray.append(commandControlPanel_)
+
+            commandDefinition_ = commandDefinitionById(id)
+            if commandDefinition_:
+                objArray.append(commandDefinition_)
 
         for obj in objArray:
             destroyObject(ui, obj)
 
+        stopLiveSync(app)
+        stopLogging()
+
     except:
         if ui:
             ui.messageBox('AddIn Stop Failed:\n{}'.format(traceback.format_exc()))
 
+def startLogging():
+    # the handlers go on the logger of the add-in's package, which paramio logs to as well
+    logger = logging.getLogger(__package__ or __name__)
+    logger.setLevel(min(logLevel, logging.INFO))
+    # the handlers below are all the log needs, not the ones of the root logger too
+    logger.propagate = False
+    # Fusion keeps the loggers when the add-in is restarted
+    stopLogging()
+    streamHandler = logging.StreamHandler()
+    streamHandler.setLevel(logLevel)
+    newHandlers = [streamHandler]
+    if logFile:
+        fileHandler = logging.FileHandler(logFile, encoding='utf-8', delay=True)
+        fileHandler.setLevel(min(logLevel, logging.INFO))
+        newHandlers.append(fileHandler)
+    for handler in newHandlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(handler)
+    logHandlers.extend(newHandlers)
+
+def stopLogging():
+    logger = logging.getLogger(__package__ or __name__)
+    for handler in logHandlers:
+        logger.removeHandler(handler)
+        handler.close()
+    del logHandlers[:]
+
 def updateParamsFromCSV():
      app = adsk.core.Application.get()
      ui  = app.userInterface
@@ -160,7 +274,7 @@ def updateParamsFromCSV():
          fileDialog = ui.createFileDialog()
          fileDialog.isMultiSelectEnabled = False
          fileDialog.title = "Get the file to read from or the file to save the parameters to"
-         fileDialog.filter = 'Text files (*.csv)'
+         fileDialog.filter = 'Text files (*.csv);;Compressed text files (*.csv.gz);;Parameter snapshots (*.psnap)'
          fileDialog.filterIndex = 0
          if readParameters:
              dialogResult = fileDialog.showOpen()
@@ -174,77 +288,341 @@ def updateParamsFromCSV():
 
          #if readParameters is true read the parameters from a file
          if readParameters:
-             readTheParameters(filename)
+             inSync = readTheParameters(filename)
          else:
-             writeTheParameters(filename)
+             inSync = writeTheParameters(filename)
+
+         # a file the import refused is not bound, an export would overwrite it
+         if liveSync and inSync:
+             bindLiveSync(app.activeProduct, filename)
 
      except:
          if ui:
              ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
             
+def siblingFileName(fileName, suffix):
+    # the name of a report that goes next to a file, e.g. params.csv.gz -> params_errors.csv
+    for extension in ('.csv.gz', '.csv.zst', '.csv'):
+        if fileName.lower().endswith(extension):
+            return fileName[:-len(extension)] + suffix
+    return fileName + suffix
+
+def finishTiming(timer, message):
+    # log the timing and add the summary to the message shown at the end of a run
+    if timingLogFile:
+        try:
+            timer.writeLog(timingLogFile)
+        except OSError:
+            logging.getLogger(__name__).warning('Could not write the timing log %s', timingLogFile, exc_info=True)
+    if showTimingSummary:
+        return message + '\n\n' + timer.summary()
+    return message
+
 def writeTheParameters(theFileName):
     app = adsk.core.Application.get()
     design = app.activeProduct
-      
-    result = ""
-    for _param in design.allParameters:
-        try:
-            paramUnit = _param.unit
-        except:
-            paramUnit = ""
-            
-        result = result + "\"" + _param.name +  "\",\"" + paramUnit +  "\",\"" + _param.expression.replace('"', '""') + "\",\"" + _param.comment + "\"\n"    
-                      
-    with open(theFileName, 'w') as outputFile:
-        outputFile.writelines(result)
-    
+    timer = timing.RunTimer('export', theFileName)
+    store = fusion.FusionParameterStore(design, timer)
+
     #get the name of the file without the path    
     pathsInTheFileName = theFileName.split("/")
+    if incrementalExport and not snapshot.isSnapshotFile(theFileName):
+        delta = exporter.export(store, theFileName, timer)
+        if delta.wrote:
+            message = 'Parameters written to {}\n{}'.format(pathsInTheFileName[-1], delta.describe())
+        else:
+            message = pathsInTheFileName[-1] + ' is already up to date'
+    else:
+        engine.exportFile(store, theFileName, timer)
+        message = 'Parameters written to ' + pathsInTheFileName[-1]
+
     ui  = app.userInterface
-    ui.messageBox('Parameters written to ' + pathsInTheFileName[-1])   
+    ui.messageBox(finishTiming(timer, message))
+    return True
    
+# returns True when the parameters match the file afterwards
 def readTheParameters(theFileName):
     app = adsk.core.Application.get()
     design = app.activeProduct
     ui  = app.userInterface
+    timer = timing.RunTimer('import', theFileName)
+    try:
+        if validateBeforeImport and not snapshot.isSnapshotFile(theFileName):
+            # a file that was checked before and did not change since is not checked again
+            with timer.phase('validate'):
+                report = tableCache.report(theFileName, lambda fileName: validate.validateFile(
+                    fileName, validateWorkers, validateChunkRows, reportFileName=siblingFileName(fileName, '_errors.csv')))
+            if not report.isValid():
+                message = 'Nothing was imported\n' + report.describe()
+                if report.reportFileName:
+                    #get the name of the file without the path
+                    message += '\nAll problems were written to ' + report.reportFileName.replace('\\', '/').split("/")[-1]
+                ui.messageBox(finishTiming(timer, message), 'Import Parameters', \
+                adsk.core.MessageBoxButtonTypes.OKButtonType, \
+                adsk.core.MessageBoxIconTypes.CriticalIconType)
+                return False
+
+        store = fusion.FusionParameterStore(design, timer)
+        if previewBeforeImport:
+            plan = preview.previewFile(store, theFileName, tableCache, timer)
+            if plan.cycle is not None:
+                ui.messageBox(finishTiming(timer, 'Nothing was imported\n' + plan.describe()))
+                return False
+            if plan.changes.isEmpty():
+                ui.messageBox(finishTiming(timer, 'The parameters already match the file\n' + plan.describe()))
+                return True
+            if not plan.isValid():
+                dialogResult = ui.messageBox(plan.describe() + '\n\nImport anyway?', 'Import Parameters', \
+                adsk.core.MessageBoxButtonTypes.YesNoButtonType, \
+                adsk.core.MessageBoxIconTypes.WarningIconType)
+                if dialogResult != adsk.core.DialogResults.DialogYes:
+                    return False
+            changes = plan.changes
+            recomputesAvoided = engine.applyChanges(store, changes, deferComputeOnImport, timer)
+        else:
+            changes, recomputesAvoided = engine.importFile(store, theFileName, deferComputeOnImport, tableCache, timer)
+
+        message = 'Finished reading and updating parameters\n' + changes.describe()
+        if deferComputeOnImport:
+            message += '\n{} recomputes avoided'.format(recomputesAvoided)
+        ui.messageBox(finishTiming(timer, message))
+        return True
+    except engine.ImportFailed as error:
+        ui.messageBox(finishTiming(timer, str(error)), 'Import Parameters', \
+        adsk.core.MessageBoxButtonTypes.OKButtonType, \
+        adsk.core.MessageBoxIconTypes.CriticalIconType)
+    except:
+        if ui:
+            ui.messageBox('AddIn Stop Failed:\n{}'.format(traceback.format_exc()))
+    return False
+
+def updateParamsFromManifest():
+    app = adsk.core.Application.get()
+    ui  = app.userInterface
+
     try:
-        paramsList = []
-        for oParam in design.allParameters:
-            paramsList.append(oParam.name)           
-        
-        # Read the csv file.
-        with open(theFileName) as csvFile:
-            csvReader = csv.reader(csvFile, dialect=csv.excel)
-            for row in csvReader:
-                # Get the values from the csv file.
-                nameOfParam = row[0]
-                unitOfParam = row[1]
-                expressionOfParam = row[2]
-                # userParameters.add does not like empty string as comment
-                # so we make it a space
-                commentOfParam = ' ' 
-                if len(row) > 3:
-                    commentOfParam = row[3]
-                    
-                # comment might be empty
-                if commentOfParam == '':
-                    commentOfParam = ' ' 
-                    
-                print(expressionOfParam)
-                    
-                # if the name of the paremeter is not an existing parameter add it
-                if nameOfParam not in paramsList:
-                    valInput_Param = adsk.core.ValueInput.createByString(expressionOfParam) 
-                    design.userParameters.add(nameOfParam, valInput_Param, unitOfParam, commentOfParam)
-                # update the values of existing parameters            
-                else:
-                    paramInModel = design.allParameters.itemByName(nameOfParam)
-                    paramInModel.unit = unitOfParam
-                    paramInModel.expression = expressionOfParam
-                    paramInModel.comment = commentOfParam
-                
-        ui.messageBox('Finished reading and updating parameters')
+        fileDialog = ui.createFileDialog()
+        fileDialog.isMultiSelectEnabled = False
+        fileDialog.title = "Get the manifest listing the designs and their parameter files"
+        fileDialog.filter = 'Text files (*.csv);;Compressed text files (*.csv.gz)'
+        fileDialog.filterIndex = 0
+        if fileDialog.showOpen() != adsk.core.DialogResults.DialogOK:
+            return
+        manifestFileName = fileDialog.filename
+
+        entries = batch.readManifest(manifestFileName)
+        stores = fusion.DocumentStores(app, saveBatchDocuments)
+        results = batch.runBatch(entries, stores, deferComputeOnImport, tableCache)
+
+        # the report goes next to the manifest
+        reportFileName = siblingFileName(manifestFileName, '_report.csv')
+        batch.writeReport(reportFileName, results)
+
+        #get the name of the file without the path
+        pathsInTheFileName = reportFileName.replace('\\', '/').split("/")
+        ui.messageBox(batch.describeResults(results) + '\nReport written to ' + pathsInTheFileName[-1])
     except:
         if ui:
-            ui.messageBox('AddIn Stop Failed:\n{}'.format(traceback.format_exc()))
\ No newline at end of file
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+def updateParamsFromDesignTable():
+    app = adsk.core.Application.get()
+    ui  = app.userInterface
+
+    try:
+        dialogResult = ui.messageBox('Applying configurations from a design table or adding the current parameters to one?\n' \
+        'Apply = Yes, Add = No', 'Design Table', \
+        adsk.core.MessageBoxButtonTypes.YesNoCancelButtonType, \
+        adsk.core.MessageBoxIconTypes.QuestionIconType)
+        if dialogResult == adsk.core.DialogResults.DialogYes:
+            applyTable = True
+        elif dialogResult == adsk.core.DialogResults.DialogNo:
+            applyTable = False
+        else:
+            return
+
+        fileDialog = ui.createFileDialog()
+        fileDialog.isMultiSelectEnabled = False
+        fileDialog.title = "Get the design table"
+        fileDialog.filter = 'Text files (*.csv);;Compressed text files (*.csv.gz)'
+        fileDialog.filterIndex = 0
+        if applyTable:
+            dialogResult = fileDialog.showOpen()
+        else:
+            dialogResult = fileDialog.showSave()
+        if dialogResult != adsk.core.DialogResults.DialogOK:
+            return
+
+        if applyTable:
+            applyDesignTable(fileDialog.filename)
+        else:
+            addToDesignTable(fileDialog.filename)
+    except:
+        if ui:
+            ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+
+def applyDesignTable(theFileName):
+    app = adsk.core.Application.get()
+    design = app.activeProduct
+    ui  = app.userInterface
+    timer = timing.RunTimer('design table', theFileName)
+    with timer.phase('parse'):
+        table = designtable.readDesignTable(theFileName)
+    configurations = table.configurations()
+    if not configurations:
+        ui.messageBox('The design table has no configurations')
+        return
+
+    # one configuration is applied, several are applied one after the other
+    # with a report of how long each took
+    chosen, cancelled = ui.inputBox('Configuration to apply, or several separated by commas to regenerate them in turn (* for all):\n' + \
+    ', '.join(configurations), 'Design Table', configurations[0])
+    if cancelled or not chosen.strip():
+        return
+    if chosen.strip() == '*':
+        chosen = configurations
+    else:
+        chosen = [name.strip() for name in chosen.split(',') if name.strip()]
+    unknown = [name for name in chosen if name not in table.columns]
+    if unknown:
+        ui.messageBox('The design table has no configuration named ' + ', '.join(unknown))
+        return
+
+    store = fusion.FusionParameterStore(design, timer)
+    if len(chosen) == 1:
+        try:
+            changes, recomputesAvoided = designtable.applyConfiguration(store, table, chosen[0], deferComputeOnImport, timer)
+        except engine.ImportFailed as error:
+            ui.messageBox(finishTiming(timer, str(error)), 'Design Table', \
+            adsk.core.MessageBoxButtonTypes.OKButtonType, \
+            adsk.core.MessageBoxIconTypes.CriticalIconType)
+            return
+        ui.messageBox(finishTiming(timer, 'Applied {}\n{}'.format(chosen[0], changes.describe())))
+        return
+
+    results = designtable.regenerate(store, table, chosen, deferComputeOnImport, timer=timer)
+    # the report goes next to the table
+    reportFileName = siblingFileName(theFileName, '_regenerate.csv')
+    designtable.writeReport(reportFileName, results)
+
+    #get the name of the file without the path
+    pathsInTheFileName = reportFileName.replace('\\', '/').split("/")
+    message = '{}\nThe design is left in {}\nReport written to {}'.format(designtable.describeResults(results), chosen[-1], pathsInTheFileName[-1])
+    ui.messageBox(finishTiming(timer, message))
+
+def addToDesignTable(theFileName):
+    app = adsk.core.Application.get()
+    design = app.activeProduct
+    ui  = app.userInterface
+    timer = timing.RunTimer('design table', theFileName)
+    with timer.phase('parse'):
+        if os.path.exists(theFileName):
+            table = designtable.readDesignTable(theFileName)
+        else:
+            table = designtable.DesignTable()
+
+    defaultName = 'Configuration {}'.format(len(table.columns) + 1)
+    name, cancelled = ui.inputBox('Name of the new configuration:', 'Design Table', defaultName)
+    if cancelled or not name.strip():
+        return
+    store = fusion.FusionParameterStore(design, timer)
+    with timer.phase('write'):
+        table.addConfiguration(name.strip(), store.rows())
+        designtable.writeDesignTable(theFileName, table)
+
+    #get the name of the file without the path
+    pathsInTheFileName = theFileName.replace('\\', '/').split("/")
+    ui.messageBox(finishTiming(timer, 'Added {} to {}'.format(name.strip(), pathsInTheFileName[-1])))
+
+def startLiveSync(app):
+    ui = app.userInterface
+
+    class LiveSyncEventHandler(adsk.core.CustomEventHandler):
+        def __init__(self):
+            super().__init__()
+        def notify(self, args):
+            try:
+                runLiveSync(args.additionalInfo)
+            except:
+                logging.getLogger(__name__).exception('Live sync %s failed', args.additionalInfo)
+
+    class CommandTerminatedHandler(adsk.core.ApplicationCommandEventHandler):
+        def __init__(self):
+            super().__init__()
+        def notify(self, args):
+            if not sync or args.terminationReason != adsk.core.CommandTerminationReason.CompletedTerminationReason:
+                return
+            if liveSyncCommandIds is not None and args.commandId not in liveSyncCommandIds:
+                return
+            # the export only writes when the command did change parameters
+            if app.activeProduct == syncDesign:
+                sync.markDirty()
+
+    customEvent = app.registerCustomEvent(liveSyncEventId)
+    onLiveSyncEvent = LiveSyncEventHandler()
+    customEvent.add(onLiveSyncEvent)
+    onCommandTerminated = CommandTerminatedHandler()
+    ui.commandTerminated.add(onCommandTerminated)
+    # keep the handlers referenced beyond this function
+    syncHandlers.extend([onLiveSyncEvent, onCommandTerminated])
+
+def stopLiveSync(app):
+    unbindLiveSync()
+    if not syncHandlers:
+        return
+    onLiveSyncEvent, onCommandTerminated = syncHandlers
+    app.userInterface.commandTerminated.remove(onCommandTerminated)
+    app.unregisterCustomEvent(liveSyncEventId)
+    del syncHandlers[:]
+
+def bindLiveSync(design, fileName):
+    global sync, syncDesign
+    if sync and sync.fileName == os.path.abspath(fileName) and syncDesign == design:
+        return
+    unbindLiveSync()
+    app = adsk.core.Application.get()
+    # the worker thread asks for the main thread through the custom event
+    post = lambda action: app.fireCustomEvent(liveSyncEventId, action)
+    sync = watcher.ParameterSync(fileName, post, liveSyncDebounce, liveSyncMinImportInterval)
+    syncDesign = design
+    sync.start()
+
+def unbindLiveSync():
+    global sync, syncDesign
+    if sync:
+        sync.stop()
+    sync = None
+    syncDesign = None
+
+def runLiveSync(action):
+    # called on the main thread when the worker thread asks for it
+    if not sync:
+        return
+    if not syncDesign.isValid:
+        unbindLiveSync()
+        return
+    store = fusion.FusionParameterStore(syncDesign)
+    if action == 'export':
+        try:
+            sync.exportRows(store.rows())
+        except:
+            # without this the worker would wait for these rows forever
+            sync.exportFailed()
+            raise
+        return
+
+    # a file that is not imported is not exported over either, until it changes again
+    imported = False
+    try:
+        plan = preview.previewFile(store, sync.fileName, tableCache)
+        if not plan.isValid():
+            logging.getLogger(__name__).warning('Not importing %s:\n%s', sync.fileName, plan.describe())
+        else:
+            if not plan.changes.isEmpty():
+                engine.applyChanges(store, plan.changes, deferComputeOnImport)
+            imported = True
+    except engine.ImportFailed as error:
+        logging.getLogger(__name__).warning('%s', error)
+    finally:
+        sync.importDone(imported)
@@ -0,0 +1,10 @@
+# Stand-in for the adsk modules Fusion 360 provides, just enough of
+# adsk.core/adsk.fusion to drive the Parameter I/O add-in outside of Fusion.
+# Every API call and every simulated model recompute is counted in stats.
+
+import collections
+
+stats = collections.Counter()
+
+def resetStats():
+    stats.clear()
@@ -0,0 +1,77 @@
+from . import stats
+
+class MessageBoxButtonTypes(object):
+    OKButtonType = 0
+    OKCancelButtonType = 1
+    RetryCancelButtonType = 2
+    YesNoButtonType = 3
+    YesNoCancelButtonType = 4
+
+class MessageBoxIconTypes(object):
+    NoIconIconType = 0
+    QuestionIconType = 1
+    InformationIconType = 2
+    WarningIconType = 3
+    CriticalIconType = 4
+
+class DialogResults(object):
+    DialogError = -1
+    DialogOK = 0
+    DialogCancel = 1
+    DialogNo = 2
+    DialogYes = 3
+
+class ValueInput(object):
+    def __init__(self, expression):
+        self.stringValue = expression
+
+    @staticmethod
+    def createByString(expression):
+        stats['ValueInput.createByString'] += 1
+        return ValueInput(expression)
+
+class CommandEventHandler(object):
+    pass
+
+class CommandCreatedEventHandler(object):
+    pass
+
+class ApplicationCommandEventHandler(object):
+    pass
+
+class CustomEventHandler(object):
+    pass
+
+class CommandTerminationReason(object):
+    UnknownTerminationReason = 0
+    CompletedTerminationReason = 1
+    CancelledTerminationReason = 2
+    AbortedTerminationReason = 3
+    PreEmptedTerminationReason = 4
+    SessionEndingTerminationReason = 5
+
+class UserInterface(object):
+    def __init__(self):
+        self.messages = []
+        # what the user answers to a Yes/No question, the add-in asks before going on
+        self.answer = DialogResults.DialogYes
+
+    def messageBox(self, text, title='', buttons=None, icon=None):
+        stats['UserInterface.messageBox'] += 1
+        self.messages.append(text)
+        if buttons in (MessageBoxButtonTypes.YesNoButtonType, MessageBoxButtonTypes.YesNoCancelButtonType):
+            return self.answer
+        return DialogResults.DialogOK
+
+class Application(object):
+    _instance = None
+
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self.activeProduct = None
+
+    @staticmethod
+    def get():
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
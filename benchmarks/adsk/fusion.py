@@ -0,0 +1,164 @@
+import math
+import time
+
+from . import stats
+
+# Fusion keeps lengths in cm
+_internalScales = {'mm': 0.1, 'cm': 1.0, 'm': 100.0, 'in': 2.54, 'ft': 30.48}
+
+class Parameter(object):
+    def __init__(self, design, name, unit, expression, comment, objectType='adsk::fusion::UserParameter'):
+        self._design = design
+        self.name = name
+        self._unit = unit
+        self._expression = expression
+        self._comment = comment
+        self.objectType = objectType
+        self.isFavorite = False
+
+    @property
+    def value(self):
+        # good enough for plain "<number> <unit>" expressions
+        stats['Parameter.value.get'] += 1
+        try:
+            return float(self._expression.split()[0]) * _internalScales.get(self._unit, 1.0)
+        except (ValueError, IndexError):
+            return math.nan
+
+    @property
+    def unit(self):
+        stats['Parameter.unit.get'] += 1
+        return self._unit
+
+    @unit.setter
+    def unit(self, value):
+        stats['Parameter.unit.set'] += 1
+        self._unit = value
+        self._design._modelChanged()
+
+    @property
+    def expression(self):
+        stats['Parameter.expression.get'] += 1
+        return self._expression
+
+    @expression.setter
+    def expression(self, value):
+        stats['Parameter.expression.set'] += 1
+        if not value.strip():
+            raise RuntimeError('3 : Invalid expression')
+        self._expression = value
+        self._design._modelChanged()
+
+    @property
+    def comment(self):
+        stats['Parameter.comment.get'] += 1
+        return self._comment
+
+    @comment.setter
+    def comment(self, value):
+        stats['Parameter.comment.set'] += 1
+        self._comment = value
+
+    def deleteMe(self):
+        stats['Parameter.deleteMe'] += 1
+        self._design._params.remove(self)
+        del self._design._byName[self.name]
+        self._design._modelChanged()
+        return True
+
+class UserParameter(Parameter):
+    @staticmethod
+    def classType():
+        return 'adsk::fusion::UserParameter'
+
+class ModelParameter(Parameter):
+    @staticmethod
+    def classType():
+        return 'adsk::fusion::ModelParameter'
+
+class ParameterList(object):
+    def __init__(self, design):
+        self._design = design
+
+    @property
+    def count(self):
+        return len(self._design._params)
+
+    def item(self, index):
+        stats['ParameterList.item'] += 1
+        return self._design._params[index]
+
+    def itemByName(self, name):
+        stats['ParameterList.itemByName'] += 1
+        # Fusion looks the name up on every call, so does the stand-in
+        for param in self._design._params:
+            if param.name == name:
+                return param
+        return None
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.item(index)
+
+    def __len__(self):
+        return self.count
+
+class UserParameters(ParameterList):
+    def add(self, name, valueInput, units, comment):
+        stats['UserParameters.add'] += 1
+        if name in self._design._byName:
+            raise RuntimeError('3 : Parameter name already exists: ' + name)
+        if not valueInput.stringValue.strip():
+            raise RuntimeError('3 : Invalid expression')
+        param = Parameter(self._design, name, units, valueInput.stringValue, comment)
+        self._design._params.append(param)
+        self._design._byName[name] = param
+        self._design._modelChanged()
+        return param
+
+class Design(object):
+    # recomputeCost is the time in seconds one simulated recompute takes
+    def __init__(self, recomputeCost=0.0):
+        self._params = []
+        self._byName = {}
+        self._computeDeferred = False
+        self._pendingCompute = False
+        self.recomputeCost = recomputeCost
+        self.isValid = True
+        self.allParameters = ParameterList(self)
+        self.userParameters = UserParameters(self)
+
+    @property
+    def isComputeDeferred(self):
+        return self._computeDeferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value):
+        self._computeDeferred = value
+        # Fusion catches up on the deferred changes when deferral is switched off
+        if not value and self._pendingCompute:
+            self._recompute()
+
+    def computeAll(self):
+        stats['Design.computeAll'] += 1
+        self._recompute()
+        return True
+
+    def _modelChanged(self):
+        if self._computeDeferred:
+            self._pendingCompute = True
+        else:
+            self._recompute()
+
+    def _recompute(self):
+        stats['recompute'] += 1
+        self._pendingCompute = False
+        if self.recomputeCost:
+            time.sleep(self.recomputeCost)
+
+    def addParameter(self, name, unit, expression, comment='', isUser=True):
+        # set up a design without counting it as an API call
+        objectType = UserParameter.classType() if isUser else ModelParameter.classType()
+        param = Parameter(self, name, unit, expression, comment, objectType)
+        self._params.append(param)
+        self._byName[name] = param
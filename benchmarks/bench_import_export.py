@@ -0,0 +1,156 @@
+# Import/export throughput of the add-in against the adsk stand-in.
+#
+#   python benchmarks/bench_import_export.py [--sizes 100,1000,10000,100000]
+#       [--recompute-cost SECONDS] [--save-baseline FILE] [--check FILE]
+#
+# For every size a CSV is generated and run through readTheParameters and
+# writeTheParameters, and every run has to end with the message the scenario
+# expects, so a refused import is not measured as a fast one. Rows/sec and peak
+# memory depend on the machine; the API call and recompute counts don't, so
+# --check compares those with a saved baseline and fails when the hot loop
+# starts making more calls.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import harness
+import adsk
+
+ParameterIO = harness.loadAddin()
+# keep the runs out of the timing log
+ParameterIO.timingLogFile = None
+
+def generateRows(count, version=0):
+    # every tenth parameter uses the one before it, version changes the value of every tenth row
+    rows = []
+    for index in range(count):
+        if index % 10 == 9:
+            expression = 'p{} + {} mm'.format(index - 1, 1 + version)
+        else:
+            expression = '{} mm'.format(index + 1 + (version if index % 10 == 0 else 0))
+        rows.append(('p{}'.format(index), 'mm', expression, 'comment {}'.format(index)))
+    return rows
+
+def writeCsv(fileName, rows):
+    with open(fileName, 'w', newline='') as csvFile:
+        for row in rows:
+            csvFile.write(','.join(row) + '\n')
+
+def designFromRows(rows, recomputeCost):
+    design = harness.newDesign(0, recomputeCost)
+    for row in rows:
+        design.addParameter(*row)
+    return design
+
+def scenarios(size, workDir, recomputeCost):
+    # name, function setting up the run and returning the call to measure, start of the last message
+    baseFile = os.path.join(workDir, 'base_{}.csv'.format(size))
+    editedFile = os.path.join(workDir, 'edited_{}.csv'.format(size))
+    exportFile = os.path.join(workDir, 'export_{}.csv'.format(size))
+    baseRows = generateRows(size)
+    writeCsv(baseFile, baseRows)
+    writeCsv(editedFile, generateRows(size, 1))
+
+    def importNew():
+        harness.newDesign(0, recomputeCost)
+        return lambda: ParameterIO.readTheParameters(baseFile)
+
+    def importEdited():
+        designFromRows(baseRows, recomputeCost)
+        return lambda: ParameterIO.readTheParameters(editedFile)
+
+    def importUnchanged():
+        designFromRows(baseRows, recomputeCost)
+        return lambda: ParameterIO.readTheParameters(baseFile)
+
+    def export():
+        designFromRows(baseRows, recomputeCost)
+        # an incremental export over the file of the run before would write nothing
+        if os.path.exists(exportFile):
+            os.remove(exportFile)
+        return lambda: ParameterIO.writeTheParameters(exportFile)
+
+    return [
+        ('import new', importNew, 'Finished reading and updating parameters'),
+        ('import 10% edited', importEdited, 'Finished reading and updating parameters'),
+        ('import unchanged', importUnchanged, 'The parameters already match the file'),
+        ('export', export, 'Parameters written to')]
+
+def checkRun(name, applied, expected):
+    ui = adsk.core.Application.get().userInterface
+    message = ui.messages[-1] if ui.messages else ''
+    if not applied or not message.startswith(expected):
+        sys.exit('{} did not apply:\n{}'.format(name, message))
+
+def measure(name, setUp, expected):
+    # one run for the time and the counts, a second one under tracemalloc for the memory
+    run = setUp()
+    ParameterIO.tableCache.clear()
+    adsk.resetStats()
+    start = time.perf_counter()
+    applied = run()
+    elapsed = time.perf_counter() - start
+    counts = dict(adsk.stats)
+    checkRun(name, applied, expected)
+
+    run = setUp()
+    ParameterIO.tableCache.clear()
+    tracemalloc.start()
+    applied = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    checkRun(name, applied, expected)
+    return elapsed, peak, counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Import/export throughput of the add-in against the adsk stand-in')
+    parser.add_argument('--sizes', default='100,1000,10000,100000')
+    parser.add_argument('--recompute-cost', type=float, default=0.0, help='seconds one simulated recompute takes')
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--check', metavar='FILE')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    # the message boxes of the add-in would pile up in the stand-in
+    ui = adsk.core.Application.get().userInterface
+
+    results = {}
+    print('{:>7} {:<18} {:>10} {:>12} {:>11} {:>10} {:>10}'.format('rows', 'scenario', 'time (s)', 'rows/sec', 'peak MiB', 'API calls', 'recomputes'))
+    with tempfile.TemporaryDirectory() as workDir:
+        for size in sizes:
+            for name, setUp, expected in scenarios(size, workDir, args.recompute_cost):
+                elapsed, peak, counts = measure('{} {}'.format(name, size), setUp, expected)
+                del ui.messages[:]
+                recomputes = counts.pop('recompute', 0)
+                counts.pop('UserInterface.messageBox', None)
+                apiCalls = sum(counts.values())
+                results['{} {}'.format(name, size)] = {'apiCalls': apiCalls, 'recomputes': recomputes, 'calls': counts}
+                print('{:>7} {:<18} {:>10.3f} {:>12.0f} {:>11.1f} {:>10} {:>10}'.format(size, name, elapsed, size / elapsed, peak / 2.0 ** 20, apiCalls, recomputes))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baselineFile:
+            json.dump(results, baselineFile, indent=1, sort_keys=True)
+
+    if args.check:
+        with open(args.check) as baselineFile:
+            baseline = json.load(baselineFile)
+        regressions = []
+        for key, result in sorted(results.items()):
+            expected = baseline.get(key)
+            if expected is None:
+                continue
+            for counter in ('apiCalls', 'recomputes'):
+                if result[counter] > expected[counter]:
+                    regressions.append('{}: {} {} > {}'.format(key, counter, result[counter], expected[counter]))
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
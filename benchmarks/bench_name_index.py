@@ -0,0 +1,58 @@
+# Compares finding the existing parameters of an import by scanning a list and
+# calling itemByName per row with the name index FusionParameterStore builds
+# once per import.
+#
+#   python benchmarks/bench_name_index.py [parameter counts...]
+
+import sys
+import time
+
+import harness
+import adsk
+
+ParameterIO = harness.loadAddin()
+fusion = ParameterIO.fusion
+
+def listScan(design, names):
+    # what readTheParameters used to do
+    paramsList = []
+    for oParam in design.allParameters:
+        paramsList.append(oParam.name)
+    found = 0
+    for nameOfParam in names:
+        if nameOfParam not in paramsList:
+            continue
+        design.allParameters.itemByName(nameOfParam)
+        found += 1
+    return found
+
+def nameIndex(design, names):
+    store = fusion.FusionParameterStore(design)
+    current = store.snapshot()
+    found = 0
+    for nameOfParam in names:
+        if nameOfParam not in current:
+            continue
+        store.parameter(nameOfParam)
+        found += 1
+    return found
+
+def timeLookups(lookup, design, names):
+    adsk.resetStats()
+    start = time.perf_counter()
+    lookup(design, names)
+    elapsed = time.perf_counter() - start
+    return elapsed, adsk.stats['ParameterList.itemByName']
+
+def main(counts):
+    print('{:>8} {:>14} {:>12} {:>14} {:>12} {:>9}'.format('params', 'list scan (s)', 'itemByName', 'name index (s)', 'itemByName', 'speedup'))
+    for count in counts:
+        design = harness.newDesign(count)
+        # every existing parameter plus 10% new ones, like re-importing an edited sheet
+        names = ['p{}'.format(index) for index in range(count + count // 10)]
+        scanTime, scanCalls = timeLookups(listScan, design, names)
+        indexTime, indexCalls = timeLookups(nameIndex, design, names)
+        print('{:>8} {:>14.4f} {:>12} {:>14.4f} {:>12} {:>8.1f}x'.format(count, scanTime, scanCalls, indexTime, indexCalls, scanTime / indexTime))
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
@@ -0,0 +1,35 @@
+# Loads the add-in the way Fusion 360 does, as a package, with the stand-in
+# adsk modules in place of the real ones.
+
+import importlib
+import os
+import sys
+import types
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+addinDir = os.path.dirname(benchmarkDir)
+
+if benchmarkDir not in sys.path:
+    sys.path.insert(0, benchmarkDir)
+
+import adsk
+import adsk.core
+import adsk.fusion
+
+def loadAddin():
+    if 'ParameterIOAddin' not in sys.modules:
+        package = types.ModuleType('ParameterIOAddin')
+        package.__path__ = [addinDir]
+        sys.modules['ParameterIOAddin'] = package
+    addin = importlib.import_module('ParameterIOAddin.ParameterIO')
+    # as the first command run in Fusion would
+    addin.loadEngine()
+    return addin
+
+def newDesign(paramCount=0, recomputeCost=0.0):
+    design = adsk.fusion.Design(recomputeCost)
+    for index in range(paramCount):
+        design.addParameter('p{}'.format(index), 'mm', '{} mm'.format(index + 1), 'comment {}'.format(index))
+    app = adsk.core.Application.get()
+    app.activeProduct = design
+    return design
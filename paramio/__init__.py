@@ -0,0 +1,4 @@
+# Parameter I/O engine used by the ParameterIO add-in.
+#
+# Only paramio.fusion imports adsk, everything else runs outside of Fusion 360
+# as well, on a MemoryParameterStore.
@@ -0,0 +1,116 @@
+# Running the import or export over many designs listed in a manifest.
+#
+# A manifest is a CSV file with one design per row:
+#
+#   design,csv[,action]
+#
+# design names an open document or is the id of a cloud file, csv is the
+# parameter file (relative paths are taken from the manifest's folder) and
+# action is import (the default) or export. A header row starting with
+# "design" is skipped.
+
+import collections
+import csv
+import os
+
+from . import cache, csvio, engine
+
+BatchEntry = collections.namedtuple('BatchEntry', ['design', 'fileName', 'action'])
+
+actions = ('import', 'export')
+
+def readManifest(fileName):
+    baseDir = os.path.dirname(os.path.abspath(fileName))
+    entries = []
+    with csvio.openText(fileName) as manifestFile:
+        for lineNumber, row in enumerate(csv.reader(manifestFile, dialect=csv.excel), 1):
+            if not row or not row[0].strip():
+                continue
+            if lineNumber == 1 and row[0].strip().lower() == 'design':
+                continue
+            if len(row) < 2:
+                raise ValueError('{} line {}: expected design,csv[,action]'.format(fileName, lineNumber))
+            action = 'import'
+            if len(row) > 2 and row[2].strip():
+                action = row[2].strip().lower()
+            if action not in actions:
+                raise ValueError('{} line {}: unknown action {!r}'.format(fileName, lineNumber, action))
+            csvFileName = os.path.join(baseDir, row[1].strip())
+            entries.append(BatchEntry(row[0].strip(), os.path.normpath(csvFileName), action))
+    return entries
+
+class BatchResult(object):
+    def __init__(self, entry):
+        self.entry = entry
+        self.changes = None
+        self.recomputesAvoided = 0
+        self.exported = 0
+        self.error = None
+
+class MemoryStores(object):
+    # The stores runBatch works on, here from a dict of design name to
+    # ParameterStore. The add-in uses fusion.DocumentStores instead.
+    def __init__(self, stores):
+        self.stores = stores
+
+    def open(self, design):
+        return self.stores[design]
+
+    def close(self, store, changed):
+        pass
+
+def runBatch(entries, stores, deferCompute=True, tableCache=None):
+    # Each parameter file is read once and shared by every design it is
+    # imported into. A failing design is recorded in its result and the batch
+    # goes on with the next one.
+    if tableCache is None:
+        tableCache = cache.TableCache()
+    results = []
+    for entry in entries:
+        result = BatchResult(entry)
+        results.append(result)
+        try:
+            store = stores.open(entry.design)
+        except Exception as error:
+            result.error = 'Could not open design: {}'.format(error)
+            continue
+
+        # only a design the import went through for is saved, one it failed
+        # for is closed without saving, whether or not the rollback worked
+        changed = False
+        try:
+            if entry.action == 'export':
+                result.exported = engine.exportFile(store, entry.fileName)
+            else:
+                result.changes = engine.planImport(store, tableCache.rows(entry.fileName))
+                result.recomputesAvoided = engine.applyChanges(store, result.changes, deferCompute)
+                changed = not result.changes.isEmpty()
+        except Exception as error:
+            result.error = str(error)
+        finally:
+            stores.close(store, changed)
+    return results
+
+reportHeader = ['design', 'csv', 'action', 'status', 'added', 'updated', 'unchanged', 'exported', 'recomputes avoided', 'error']
+
+def writeReport(fileName, results):
+    with csvio.openText(fileName, 'w') as reportFile:
+        csvWriter = csv.writer(reportFile, dialect=csv.excel, lineterminator='\n')
+        csvWriter.writerow(reportHeader)
+        for result in results:
+            changes = result.changes
+            csvWriter.writerow([
+                result.entry.design,
+                result.entry.fileName,
+                result.entry.action,
+                'failed' if result.error else 'ok',
+                len(changes.added) if changes else '',
+                len(changes.modified) if changes else '',
+                len(changes.unchanged) if changes else '',
+                result.exported if result.entry.action == 'export' else '',
+                result.recomputesAvoided,
+                result.error or ''])
+
+def describeResults(results):
+    failed = len([result for result in results if result.error])
+    return '{} designs processed, {} failed'.format(len(results), failed)
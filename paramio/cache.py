@@ -0,0 +1,166 @@
+# Keeping parsed parameter files in memory, so applying the same file to
+# design after design only reads it once.
+#
+# Tables are keyed on (path, size, mtime, content hash). While the size and
+# modification time of a file stay the same its hash is not computed again;
+# when they change the content is hashed, so a file that was only touched or
+# copied is still found. With sidecar switched on the parsed rows are also
+# pickled next to the CSV (<name>.csv.pcache) for the next session. The
+# validation report of a file is kept under the same key, so a file that was
+# checked before is not checked again.
+
+import collections
+import hashlib
+import io
+import os
+import pickle
+
+from . import csvio
+from .core import ParameterRow
+
+sidecarSuffix = '.pcache'
+_sidecarVersion = 1
+
+class TableCache(object):
+    def __init__(self, maxTables=16, maxRows=500000, sidecar=False):
+        self.maxTables = maxTables
+        self.maxRows = maxRows
+        self.sidecar = sidecar
+        # (path, size, mtime, hash) -> tuple of rows, least recently used first
+        self._tables = collections.OrderedDict()
+        # path -> (size, mtime, hash of the content) as last seen
+        self._hashes = {}
+        self._rowCount = 0
+        # (path, size, mtime, hash) -> validation report, least recently used first
+        self._reports = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.sidecarHits = 0
+        self.evictions = 0
+        self.reportHits = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'sidecarHits': self.sidecarHits,
+            'evictions': self.evictions,
+            'reportHits': self.reportHits,
+            'tables': len(self._tables),
+            'reports': len(self._reports),
+            'rows': self._rowCount}
+
+    def clear(self):
+        self._tables.clear()
+        self._hashes.clear()
+        self._reports.clear()
+        self._rowCount = 0
+
+    def _key(self, path):
+        # (path, size, mtime, hash) of the file and its content if it had to
+        # be read to hash it, else None
+        fileStat = os.stat(path)
+        statKey = (path, fileStat.st_size, fileStat.st_mtime_ns)
+        data = None
+        seen = self._hashes.get(path)
+        if seen is not None and seen[:2] == statKey[1:]:
+            contentHash = seen[2]
+        else:
+            with open(path, 'rb') as binaryFile:
+                data = binaryFile.read()
+            contentHash = hashlib.sha1(data).hexdigest()
+            self._hashes[path] = statKey[1:] + (contentHash,)
+        return statKey + (contentHash,), data
+
+    def report(self, fileName, validateFile):
+        # The validation report of the file. validateFile(fileName) is only
+        # called when the file was not checked before or changed since.
+        path = os.path.abspath(fileName)
+        key = self._key(path)[0]
+        report = self._reports.get(key)
+        if report is None:
+            # drop the reports of older versions of the file, unless it is the
+            # same content under another modification time
+            for otherKey in [otherKey for otherKey in self._reports if otherKey[0] == path]:
+                otherReport = self._reports.pop(otherKey)
+                if otherKey[3] == key[3]:
+                    report = otherReport
+            if report is not None:
+                self._reports[key] = report
+        if report is not None:
+            self._reports.move_to_end(key)
+            self.reportHits += 1
+            return report
+        report = validateFile(fileName)
+        self._reports[key] = report
+        while len(self._reports) > self.maxTables:
+            self._reports.popitem(last=False)
+        return report
+
+    def rows(self, fileName):
+        # the rows of the file as a tuple of ParameterRow
+        path = os.path.abspath(fileName)
+        key, data = self._key(path)
+        contentHash = key[3]
+        table = self._tables.get(key)
+        if table is None:
+            # drop what is cached for older versions of the file, unless it is
+            # the same content under another modification time, e.g. a touched file
+            for otherKey in [otherKey for otherKey in self._tables if otherKey[0] == path]:
+                otherTable = self._tables.pop(otherKey)
+                self._rowCount -= len(otherTable)
+                if otherKey[3] == contentHash:
+                    table = otherTable
+            if table is not None:
+                self._store(key, table)
+        if table is not None:
+            self._tables.move_to_end(key)
+            self.hits += 1
+            return table
+
+        self.misses += 1
+        table = self._readSidecar(path, contentHash)
+        if table is None:
+            if data is None:
+                with open(path, 'rb') as binaryFile:
+                    data = binaryFile.read()
+            with csvio.openText(path, source=io.BytesIO(data)) as csvFile:
+                table = tuple(csvio.readParameterRows(csvFile))
+            self._writeSidecar(path, contentHash, table)
+        else:
+            self.sidecarHits += 1
+        self._store(key, table)
+        return table
+
+    def _store(self, key, table):
+        self._tables[key] = table
+        self._rowCount += len(table)
+        # always keep the newest table, even if it is bigger than maxRows on its own
+        while len(self._tables) > 1 and (len(self._tables) > self.maxTables or self._rowCount > self.maxRows):
+            oldKey, oldTable = self._tables.popitem(last=False)
+            self._rowCount -= len(oldTable)
+            self.evictions += 1
+
+    def _readSidecar(self, path, contentHash):
+        if not self.sidecar:
+            return None
+        try:
+            with open(path + sidecarSuffix, 'rb') as sidecarFile:
+                version, sidecarHash, rows = pickle.load(sidecarFile)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return None
+        if version != _sidecarVersion or sidecarHash != contentHash:
+            return None
+        return tuple(ParameterRow(*row) for row in rows)
+
+    def _writeSidecar(self, path, contentHash, table):
+        if not self.sidecar:
+            return
+        # plain tuples so the sidecar does not depend on the module path of ParameterRow
+        rows = [tuple(row) for row in table]
+        try:
+            with open(path + sidecarSuffix, 'wb') as sidecarFile:
+                pickle.dump((_sidecarVersion, contentHash, rows), sidecarFile, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            # the folder might be read only, the cache then just stays in memory
+            pass
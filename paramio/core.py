@@ -0,0 +1,177 @@
+# Comparing the parameters found in a CSV file with the ones already in a design
+
+import collections
+
+from .expressions import ExpressionError, referencedNames
+
+# A parameter as it is read from a CSV row or captured from a design. A
+# comment of None leaves the comment of an existing parameter as it is.
+ParameterRow = collections.namedtuple('ParameterRow', ['name', 'unit', 'expression', 'comment'])
+
+# The fields an import can change on an existing parameter, in the order they
+# have to be applied: the unit has to be right before the expression is set
+FIELDS = ('unit', 'expression', 'comment')
+
+def normalizeComment(comment):
+    # userParameters.add does not like empty string as comment
+    # so we make it a space
+    if not comment:
+        return ' '
+    return comment
+
+def changedFields(existing, row):
+    fields = []
+    if existing.unit != row.unit:
+        fields.append('unit')
+    if existing.expression != row.expression:
+        fields.append('expression')
+    if row.comment is not None and normalizeComment(existing.comment) != normalizeComment(row.comment):
+        fields.append('comment')
+    return tuple(fields)
+
+class ChangeSet(object):
+    def __init__(self):
+        # rows of parameters that are not in the design yet
+        self.added = []
+        # (row, names of the fields that differ) for existing parameters
+        self.modified = []
+        # names of existing parameters that already match the file
+        self.unchanged = []
+        # name -> row captured from the design for the modified parameters,
+        # to put them back if the import fails
+        self.previous = {}
+        # names of the added and modified parameters in the order they have
+        # to be applied, set by orderByDependencies
+        self.order = None
+
+    def isEmpty(self):
+        return not self.added and not self.modified
+
+    def inApplyOrder(self):
+        # (row, fields) for every parameter to add or update, fields is None
+        # for the parameters that have to be added
+        edits = collections.OrderedDict()
+        for row in self.added:
+            edits[row.name] = (row, None)
+        for row, fields in self.modified:
+            edits[row.name] = (row, fields)
+        if self.order is None:
+            return list(edits.values())
+        return [edits[name] for name in self.order]
+
+    def describe(self):
+        return '{} added, {} updated, {} unchanged'.format(len(self.added), len(self.modified), len(self.unchanged))
+
+def computeChangeSet(current, rows):
+    # current maps parameter names to the ParameterRow captured from the design.
+    # If a name is in the file more than once the last row wins.
+    rowsByName = collections.OrderedDict()
+    for row in rows:
+        rowsByName[row.name] = row
+
+    changes = ChangeSet()
+    for name, row in rowsByName.items():
+        existing = current.get(name)
+        if existing is None:
+            changes.added.append(row)
+            continue
+        fields = changedFields(existing, row)
+        if fields:
+            changes.modified.append((row, fields))
+            changes.previous[name] = existing
+        else:
+            changes.unchanged.append(name)
+    return changes
+
+class DependencyCycleError(Exception):
+    def __init__(self, cycle):
+        super().__init__(cycle)
+        self.cycle = cycle
+
+    def __str__(self):
+        return 'Parameters reference each other in a cycle: ' + ' -> '.join(self.cycle)
+
+_visiting = 1
+_done = 2
+
+def dependencyOrder(names, expressions):
+    # All names the expressions of names use, directly or through other
+    # parameters, and names themselves, each after the names its expression
+    # uses. expressions maps every known name to its expression.
+    dependencies = {}
+    def dependenciesOf(name):
+        if name not in dependencies:
+            dependencies[name] = referencedNames(expressions[name], expressions)
+        return dependencies[name]
+
+    # depth first, without recursion as chains of parameters can be long
+    order = []
+    state = {}
+    for startName in names:
+        if startName in state:
+            continue
+        state[startName] = _visiting
+        stack = [(startName, iter(dependenciesOf(startName)))]
+        while stack:
+            name, children = stack[-1]
+            for child in children:
+                childState = state.get(child)
+                if childState is None:
+                    state[child] = _visiting
+                    stack.append((child, iter(dependenciesOf(child))))
+                    break
+                if childState == _visiting:
+                    path = [stackName for stackName, stackChildren in stack]
+                    raise DependencyCycleError(path[path.index(child):] + [child])
+            else:
+                stack.pop()
+                state[name] = _done
+                order.append(name)
+    return order
+
+class Unresolved(Exception):
+    # a parameter uses another one that could not be evaluated, it is not an
+    # ExpressionError so it goes past the handlers of single expressions
+    def __init__(self, name):
+        super().__init__('uses {} which could not be evaluated'.format(name))
+        self.name = name
+
+def evaluateInOrder(names, expressions, evaluate):
+    # Evaluate names and the parameters they use in dependencyOrder.
+    # evaluate(name, lookup) returns the value of name, lookup gives the values
+    # evaluated before it and raises Unresolved for one that failed. Yields
+    # (name, value, None) or (name, None, the Unresolved, ExpressionError or
+    # ArithmeticError raised).
+    values = {}
+    failed = set()
+    def lookup(name):
+        if name in failed:
+            raise Unresolved(name)
+        return values.get(name)
+
+    for name in dependencyOrder(names, expressions):
+        try:
+            values[name] = evaluate(name, lookup)
+        except (Unresolved, ExpressionError, ArithmeticError) as error:
+            failed.add(name)
+            yield name, None, error
+        else:
+            yield name, values[name], None
+
+def expressionsAfterImport(changes, current):
+    # the expression of every parameter as it will be once the changes are applied
+    expressions = dict((name, existing.expression) for name, existing in current.items())
+    for row, fields in changes.inApplyOrder():
+        expressions[row.name] = row.expression
+    return expressions
+
+def orderByDependencies(changes, current):
+    # Sort the edits so every parameter comes after the parameters its expression
+    # uses, keeping the file order where it does not matter. The graph is made of
+    # the expressions in the file plus the ones of the parameters already in the
+    # design, so a cycle through an existing parameter is found too.
+    edits = changes.inApplyOrder()
+    changedNames = set(row.name for row, fields in edits)
+    order = dependencyOrder([row.name for row, fields in edits], expressionsAfterImport(changes, current))
+    changes.order = [name for name in order if name in changedNames]
+    return changes
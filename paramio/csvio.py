@@ -0,0 +1,168 @@
+# Reading and writing parameters as CSV files in the name, unit, expression, comment layout
+#
+# Files are written as UTF-8. When reading, a byte order mark, like the one
+# Excel puts in front of a "CSV UTF-8" file, is skipped and UTF-16 files are
+# recognised by theirs. In a file without one, bytes that are not UTF-8, like
+# the accents of a plain "CSV" saved by Excel, are read in the locale encoding,
+# or in cp1252 when the locale is UTF-8 itself. Files ending in .gz are gzip compressed and files
+# ending in .zst zstd compressed (Python 3.14 or the zstandard package), they
+# are compressed and decompressed while they are streamed.
+
+import codecs
+import csv
+import gzip
+import io
+import locale
+import os
+
+from .core import ParameterRow, normalizeComment
+
+encoding = 'utf-8'
+
+# size of the buffer used when reading a parameter file, large reads are a lot
+# faster on network drives
+readBufferSize = 1024 * 1024
+
+# size of the buffer used when writing a parameter file
+writeBufferSize = 64 * 1024
+
+# gzip level of compressed files, higher levels take a lot longer for little gain
+compressLevel = 6
+
+def compressionOf(fileName):
+    lowerName = fileName.lower()
+    if lowerName.endswith('.gz'):
+        return 'gzip'
+    if lowerName.endswith('.zst'):
+        return 'zstd'
+    return None
+
+def _zstd():
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError('.zst files need Python 3.14 or the zstandard package (pip install zstandard)')
+    return zstandard
+
+def _fallbackEncoding():
+    preferred = locale.getpreferredencoding(False)
+    try:
+        if codecs.lookup(preferred).name not in ('utf-8', 'ascii'):
+            return preferred
+    except LookupError:
+        pass
+    return 'cp1252'
+
+fallbackEncoding = _fallbackEncoding()
+
+def _decodeFallback(error):
+    # error handler for the bytes of a file without a byte order mark that are not UTF-8
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    data = error.object[error.start:error.end]
+    try:
+        return data.decode(fallbackEncoding), error.end
+    except UnicodeDecodeError:
+        # the few bytes cp1252 leaves undefined
+        return data.decode('latin-1'), error.end
+
+codecs.register_error('paramio.fallback', _decodeFallback)
+
+def detectEncoding(start):
+    # the encoding of a file from its first bytes
+    if start.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if start.startswith(codecs.BOM_UTF16_LE) or start.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16'
+    return encoding
+
+def openBinary(fileName, mode='rb', source=None):
+    # The file as a binary stream, decompressed or compressed on the fly when
+    # fileName is a compressed file. source is where the data really is when
+    # that is not fileName, another path or a binary file object.
+    if source is None:
+        source = fileName
+    compression = compressionOf(fileName)
+    if compression == 'gzip':
+        return gzip.open(source, mode, compresslevel=compressLevel)
+    if compression == 'zstd':
+        return _zstd().open(source, mode)
+    if isinstance(source, str):
+        return open(source, mode, buffering=readBufferSize if 'r' in mode else writeBufferSize)
+    return source
+
+def openText(fileName, mode='r', source=None):
+    # A text stream for reading ('r') or writing ('w') a CSV file, see the top
+    # of this file for the encodings and compressions. Newlines are left to the
+    # csv module.
+    binaryFile = openBinary(fileName, mode + 'b', source)
+    if 'w' in mode:
+        if compressionOf(fileName):
+            # hand the compressor large blocks instead of every line
+            binaryFile = io.BufferedWriter(binaryFile, writeBufferSize)
+        return io.TextIOWrapper(binaryFile, encoding=encoding, newline='')
+    if not isinstance(binaryFile, io.BufferedReader):
+        binaryFile = io.BufferedReader(binaryFile, readBufferSize)
+    try:
+        start = binaryFile.peek(4)[:4]
+    except (EOFError, OSError):
+        # a damaged compressed file, the error comes again on the first read
+        start = b''
+    fileEncoding = detectEncoding(start)
+    errors = 'paramio.fallback' if fileEncoding == encoding else 'strict'
+    return io.TextIOWrapper(binaryFile, encoding=fileEncoding, errors=errors, newline='')
+
+def readParameterFile(fileName):
+    with openText(fileName) as csvFile:
+        return list(readParameterRows(csvFile))
+
+def readParameterRows(csvFile):
+    csvReader = csv.reader(csvFile, dialect=csv.excel)
+    for row in csvReader:
+        # skip blank lines
+        if not row:
+            continue
+        if len(row) < 3:
+            raise ValueError('line {}: expected name,unit,expression[,comment] but found {!r}'.format(csvReader.line_num, ','.join(row)))
+        # comment might be missing
+        commentOfParam = ''
+        if len(row) > 3:
+            commentOfParam = row[3]
+        yield ParameterRow(row[0], row[1], row[2], normalizeComment(commentOfParam))
+
+def writeParameterRows(outputFile, rows):
+    # Write the rows one by one to any text file-like object, for instance
+    # a gzip stream or a socket wrapper, without building the file in memory.
+    # Every field is quoted so commas and quotes in names and comments survive.
+    csvWriter = csv.writer(outputFile, dialect=csv.excel, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    count = 0
+    for row in rows:
+        csvWriter.writerow(row)
+        count += 1
+    return count
+
+def writeParameterFile(fileName, rows):
+    with openText(fileName, 'w') as outputFile:
+        return writeParameterRows(outputFile, rows)
+
+def writeTable(fileName, table):
+    # Write the rows of fields, every field quoted, next to the file and move
+    # them over it, so a failed write leaves the file as it was.
+    temporaryName = fileName + '.tmp'
+    with openText(fileName, 'w', temporaryName) as outputFile:
+        csvWriter = csv.writer(outputFile, dialect=csv.excel, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        csvWriter.writerows(table)
+    os.replace(temporaryName, fileName)
+
+def fileState(fileName):
+    # size and modification time of the file, None when there is no file
+    try:
+        fileStat = os.stat(fileName)
+    except OSError:
+        return None
+    return (fileStat.st_size, fileStat.st_mtime_ns)
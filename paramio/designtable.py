@@ -0,0 +1,171 @@
+# Design tables: many configurations of the parameters in one wide CSV file.
+#
+# There is one row per parameter and one column per configuration:
+#
+#   name,unit,comment,<configuration>,<configuration>,...
+#
+# A cell is the expression the parameter gets in that configuration, an empty
+# cell leaves the parameter as it is when the configuration is applied. The
+# header row is required, it names the configurations.
+
+import collections
+import csv
+import time
+
+from . import csvio, engine
+from .core import ParameterRow
+from .timing import nullTimer
+
+_header = ['name', 'unit', 'comment']
+
+# the name, unit and comment of a parameter in the table
+TableParameter = collections.namedtuple('TableParameter', ['name', 'unit', 'comment'])
+
+class DesignTable(object):
+    def __init__(self, parameters=(), configurations=()):
+        self.parameters = list(parameters)
+        self._positions = dict((parameter.name, position) for position, parameter in enumerate(self.parameters))
+        # configuration name -> expressions in the order of parameters, '' where the cell is empty
+        self.columns = collections.OrderedDict()
+        for name, expressions in configurations:
+            self._addColumn(name, list(expressions))
+
+    def configurations(self):
+        return list(self.columns)
+
+    def _addColumn(self, name, expressions):
+        if not name:
+            raise ValueError('A configuration needs a name')
+        if name in self.columns:
+            raise ValueError('The design table already has a configuration named ' + name)
+        expressions.extend([''] * (len(self.parameters) - len(expressions)))
+        self.columns[name] = expressions
+
+    # The rows an import of the configuration is made of. An empty comment in
+    # the table leaves the comment of the parameter as it is.
+    def rows(self, configuration):
+        if configuration not in self.columns:
+            raise KeyError('The design table has no configuration named {}'.format(configuration))
+        return [ParameterRow(parameter.name, parameter.unit, expression, parameter.comment or None)
+                for parameter, expression in zip(self.parameters, self.columns[configuration]) if expression]
+
+    # Add the parameters as a new configuration, for instance the rows of a
+    # store to capture the current model. Parameters the table does not have
+    # yet are added to it, empty in the other configurations.
+    def addConfiguration(self, name, rows):
+        rows = list(rows)
+        conflicts = [row.name for row in rows
+                     if row.name in self._positions and self.parameters[self._positions[row.name]].unit != row.unit]
+        if conflicts:
+            raise ValueError('The unit in the design table differs for: ' + ', '.join(conflicts))
+        expressions = [''] * len(self.parameters)
+        for row in rows:
+            position = self._positions.get(row.name)
+            if position is None:
+                position = self._positions[row.name] = len(self.parameters)
+                self.parameters.append(TableParameter(row.name, row.unit, row.comment.strip()))
+                for column in self.columns.values():
+                    column.append('')
+                expressions.append('')
+            expressions[position] = row.expression
+        self._addColumn(name, expressions)
+
+def readDesignTable(fileName):
+    with csvio.openText(fileName) as tableFile:
+        csvReader = csv.reader(tableFile, dialect=csv.excel)
+        header = next(csvReader, None)
+        if not header or [field.strip().lower() for field in header[:3]] != _header:
+            raise ValueError('{}: a design table starts with a name,unit,comment,<configuration>... header'.format(fileName))
+        configurationNames = [field.strip() for field in header[3:]]
+        parameters = []
+        cells = []
+        names = set()
+        for lineNumber, row in enumerate(csvReader, 2):
+            # skip blank lines
+            if not row or not row[0].strip():
+                continue
+            if len(row) < 2:
+                raise ValueError('{} line {}: a parameter needs at least a name and a unit'.format(fileName, lineNumber))
+            name = row[0].strip()
+            if name in names:
+                raise ValueError('{} line {}: {} is in the table twice'.format(fileName, lineNumber, name))
+            names.add(name)
+            parameters.append(TableParameter(name, row[1].strip(), row[2] if len(row) > 2 else ''))
+            cells.append([cell.strip() for cell in row[3:]])
+    columns = [(name, [row[index] if index < len(row) else '' for row in cells])
+               for index, name in enumerate(configurationNames)]
+    return DesignTable(parameters, columns)
+
+def _tableRows(table):
+    yield _header + table.configurations()
+    columns = list(table.columns.values())
+    for position, parameter in enumerate(table.parameters):
+        yield list(parameter) + [column[position] for column in columns]
+
+def writeDesignTable(fileName, table):
+    # a failed write leaves the table as it was
+    csvio.writeTable(fileName, _tableRows(table))
+
+def applyConfiguration(store, table, configuration, deferCompute=True, timer=nullTimer):
+    # returns the applied change set and the number of recomputes avoided
+    changes = engine.planImport(store, table.rows(configuration), timer)
+    return changes, engine.applyChanges(store, changes, deferCompute, timer)
+
+class ConfigurationResult(object):
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.changes = None
+        self.recomputesAvoided = 0
+        # seconds taken to plan and apply the configuration, recompute included
+        self.elapsed = 0.0
+        self.error = None
+
+def regenerate(store, table, configurations=None, deferCompute=True, afterEach=None, timer=nullTimer):
+    # Apply the configurations one after the other, all of them by default.
+    # The table is parsed once and the store keeps its name index between
+    # them, so each configuration only costs its own edits. afterEach(result)
+    # is called with the model in that configuration, for instance to export
+    # it, when that changes parameters call store.refresh(). A configuration
+    # that fails is undone and recorded in its result.
+    results = []
+    for configuration in configurations if configurations is not None else table.configurations():
+        result = ConfigurationResult(configuration)
+        results.append(result)
+        start = time.perf_counter()
+        try:
+            result.changes, result.recomputesAvoided = applyConfiguration(store, table, configuration, deferCompute, timer)
+        except Exception as error:
+            result.error = str(error)
+        result.elapsed = time.perf_counter() - start
+        timer.count('configurations')
+        if afterEach and result.error is None:
+            afterEach(result)
+    return results
+
+reportHeader = ['configuration', 'status', 'added', 'updated', 'unchanged', 'recomputes avoided', 'seconds', 'error']
+
+def writeReport(fileName, results):
+    with csvio.openText(fileName, 'w') as reportFile:
+        csvWriter = csv.writer(reportFile, dialect=csv.excel, lineterminator='\n')
+        csvWriter.writerow(reportHeader)
+        for result in results:
+            changes = result.changes
+            csvWriter.writerow([
+                result.configuration,
+                'failed' if result.error else 'ok',
+                len(changes.added) if changes else '',
+                len(changes.modified) if changes else '',
+                len(changes.unchanged) if changes else '',
+                result.recomputesAvoided,
+                '{:.4f}'.format(result.elapsed),
+                result.error or ''])
+
+def describeResults(results):
+    failed = len([result for result in results if result.error])
+    lines = ['{} configurations applied, {} failed'.format(len(results), failed)]
+    if results:
+        elapsed = [result.elapsed for result in results]
+        slowest = max(results, key=lambda result: result.elapsed)
+        lines.append('{:.3f} s in all, {:.3f} s per configuration, slowest {} ({:.3f} s)'.format(
+            sum(elapsed), sum(elapsed) / len(elapsed), slowest.configuration, slowest.elapsed))
+    return '\n'.join(lines)
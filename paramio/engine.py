@@ -0,0 +1,146 @@
+# Importing and exporting parameters on any ParameterStore
+
+import concurrent.futures
+import logging
+
+from . import core, csvio, snapshot
+from .store import MemoryParameterStore
+from .timing import nullTimer
+
+logger = logging.getLogger(__name__)
+
+# unit and expression changes make the model recompute, comments don't
+_modelFields = ('unit', 'expression')
+
+def planImport(store, rows, timer=nullTimer):
+    # Work out what an import of the rows would change, in the order the
+    # edits have to be applied. Nothing in the store is changed.
+    with timer.phase('resolve'):
+        current = store.snapshot()
+        changes = core.computeChangeSet(current, rows)
+        # fails before anything is changed if the parameters reference each other in a cycle
+        core.orderByDependencies(changes, current)
+    countChanges(changes, timer)
+    return changes
+
+def countChanges(changes, timer):
+    timer.count('added', len(changes.added))
+    timer.count('updated', len(changes.modified))
+    timer.count('unchanged', len(changes.unchanged))
+
+class ImportFailed(Exception):
+    # An edit of the import failed. The edits made before it were undone
+    # unless rollbackError says why that did not work either.
+    def __init__(self, row, position, error, rollbackError=None):
+        super().__init__(row, position, error, rollbackError)
+        self.row = row
+        self.position = position
+        self.error = error
+        self.rollbackError = rollbackError
+
+    def __str__(self):
+        message = 'Importing {} = {} (edit {}) failed: {}'.format(self.row.name, self.row.expression, self.position, self.error)
+        if self.rollbackError is None:
+            return message + '\nThe parameters were restored to what they were before the import.'
+        return message + '\nRestoring the parameters failed too: {}'.format(self.rollbackError)
+
+def _rollBack(store, changes, applied):
+    # undo the edits in reverse, so parameters are removed before the ones they use
+    for row, fields in reversed(applied):
+        if fields is None:
+            store.removeParameter(row.name)
+        else:
+            store.updateParameter(changes.previous[row.name], fields)
+
+def _applyEdits(store, changes):
+    # returns the number of edits that made the model recompute
+    modelEdits = 0
+    applied = []
+    for position, (row, fields) in enumerate(changes.inApplyOrder(), 1):
+        logger.debug('%s = %s', row.name, row.expression)
+        try:
+            # if the name of the paremeter is not an existing parameter add it
+            if fields is None:
+                store.addParameter(row)
+                modelEdits += 1
+            else:
+                # an update can fail after setting some of the fields, so it is undone as well
+                applied.append((row, fields))
+                store.updateParameter(row, fields)
+                modelEdits += len([field for field in fields if field in _modelFields])
+                continue
+        except Exception as error:
+            try:
+                _rollBack(store, changes, applied)
+            except Exception as rollbackError:
+                raise ImportFailed(row, position, error, rollbackError)
+            raise ImportFailed(row, position, error)
+        applied.append((row, fields))
+    return modelEdits
+
+def applyChanges(store, changes, deferCompute=True, timer=nullTimer):
+    # All or nothing: if an edit fails the ones before it are undone and
+    # ImportFailed is raised. With deferCompute all edits, and the undo of
+    # them, are made in one batch so the model is recomputed once.
+    # Returns the number of recomputes that were avoided.
+    if not deferCompute:
+        with timer.phase('apply'):
+            _applyEdits(store, changes)
+        return 0
+    store.beginBatch()
+    try:
+        with timer.phase('apply'):
+            modelEdits = _applyEdits(store, changes)
+    finally:
+        with timer.phase('recompute'):
+            store.endBatch()
+    recomputesAvoided = max(modelEdits - 1, 0)
+    timer.count('recomputes avoided', recomputesAvoided)
+    return recomputesAvoided
+
+def readFileRows(fileName, tableCache=None, timer=nullTimer):
+    # The rows of a parameter file, from the cache.TableCache if one is given.
+    # Snapshots are memory-mapped and not worth caching.
+    with timer.phase('parse'):
+        if snapshot.isSnapshotFile(fileName):
+            rows = snapshot.readSnapshotRows(fileName)
+        elif tableCache is not None:
+            rows = tableCache.rows(fileName)
+        else:
+            rows = csvio.readParameterFile(fileName)
+    timer.count('rows', len(rows))
+    return rows
+
+def importFile(store, fileName, deferCompute=True, tableCache=None, timer=nullTimer):
+    # returns the applied change set and the number of recomputes avoided
+    changes = planImport(store, readFileRows(fileName, tableCache, timer), timer)
+    return changes, applyChanges(store, changes, deferCompute, timer)
+
+def exportFile(store, fileName, timer=nullTimer):
+    # the parameters are read from the store while the file is written
+    with timer.phase('write'):
+        if snapshot.isSnapshotFile(fileName):
+            count = snapshot.writeSnapshotFile(fileName, store.records())
+        else:
+            count = csvio.writeParameterFile(fileName, store.rows())
+    timer.count('rows written', count)
+    return count
+
+def planFile(baseRows, fileName):
+    with csvio.openText(fileName) as csvFile:
+        return planImport(MemoryParameterStore(baseRows), csvio.readParameterRows(csvFile))
+
+def planFiles(baseRows, fileNames, maxWorkers=None):
+    # Plan the import of many files against the same parameters in parallel
+    # processes. Returns a dict of file name to its ChangeSet, or to the
+    # exception raised for it when the file could not be planned.
+    baseRows = list(baseRows)
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(maxWorkers) as executor:
+        futures = dict((executor.submit(planFile, baseRows, fileName), fileName) for fileName in fileNames)
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as error:
+                results[futures[future]] = error
+    return results
@@ -0,0 +1,321 @@
+# Looking into parameter expressions such as "Width * Height / 2"
+
+import collections
+import math
+import re
+
+from . import units
+
+# quoted text, numbers (so the "e3" in "1e3" is not taken for a name) and names
+_tokenPattern = re.compile(r"""'[^']*'|"[^"]*"|\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?|[^\W\d]\w*""")
+
+def referencedNames(expression, knownNames):
+    # names of the parameters in knownNames that the expression uses, in the
+    # order they first appear. Anything else, like units and functions, is skipped
+    names = []
+    for token in _tokenPattern.findall(expression):
+        if token in knownNames and token not in names:
+            names.append(token)
+    return names
+
+class ExpressionError(ValueError):
+    pass
+
+# the expression uses something that can't be evaluated outside of Fusion,
+# like text values or functions this evaluator doesn't know
+class UnsupportedExpression(ExpressionError):
+    pass
+
+# the expression evaluates to a value that doesn't fit the parameter's unit
+class UnitConflict(ExpressionError):
+    pass
+
+# A value in base units (see units.py) with its dimensions. value can be a
+# float or, when evaluating many variants at once, an array.
+Quantity = collections.namedtuple('Quantity', ['value', 'dims'])
+
+_scanPattern = re.compile(r"""\s*(?:(?P<number>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|(?P<name>[^\W\d]\w*)|(?P<string>'[^']*'|"[^"]*")|(?P<op>[-+*/^(),]))""")
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    end = len(expression.rstrip())
+    while position < end:
+        match = _scanPattern.match(expression, position)
+        if not match or match.end() == position:
+            raise ExpressionError('unexpected {!r} at position {}'.format(expression[position:].strip()[:1], position + 1))
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+class _Parser(object):
+    # Builds a tree of tuples from the tokens:
+    #   ('number', value), ('name', name), ('string', text), ('negate', node),
+    #   ('binary', op, left, right) and ('call', name, [args])
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = tokenize(expression)
+        self.position = 0
+
+    def peek(self, offset=0):
+        if self.position + offset < len(self.tokens):
+            return self.tokens[self.position + offset]
+        return (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, op):
+        kind, text = self.take()
+        if kind != 'op' or text != op:
+            raise ExpressionError('expected {!r} in {!r}'.format(op, self.expression))
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError('empty expression')
+        node = self.parseSum()
+        if self.position != len(self.tokens):
+            raise ExpressionError('unexpected {!r} in {!r}'.format(self.peek()[1], self.expression))
+        return node
+
+    def parseSum(self):
+        node = self.parseProduct()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.take()[1]
+            node = ('binary', op, node, self.parseProduct())
+        return node
+
+    def parseProduct(self):
+        node = self.parseUnary()
+        while True:
+            kind, text = self.peek()
+            if kind == 'op' and text in '*/':
+                self.take()
+                node = ('binary', text, node, self.parseUnary())
+            elif kind == 'name':
+                # "(1 + 2) mm" multiplies without an operator
+                node = ('binary', '*', node, self.parseUnary())
+            else:
+                return node
+
+    def parseUnary(self):
+        kind, text = self.peek()
+        if kind == 'op' and text in '+-':
+            self.take()
+            operand = self.parseUnary()
+            return ('negate', operand) if text == '-' else operand
+        return self.parsePower()
+
+    def parsePower(self):
+        node = self.parsePrimary()
+        if self.peek() == ('op', '^'):
+            self.take()
+            node = ('binary', '^', node, self.parseUnary())
+        return node
+
+    def parsePrimary(self):
+        kind, text = self.take()
+        if kind == 'number':
+            node = ('number', float(text))
+            # the unit of "5 mm" belongs to the number, so "Width / 2 mm" is
+            # Width / (2 mm) and "5 mm^2" is 5 (mm^2)
+            if self.peek()[0] == 'name':
+                node = ('binary', '*', node, self.parsePower())
+            return node
+        if kind == 'string':
+            return ('string', text[1:-1])
+        if kind == 'name':
+            if self.peek() == ('op', '('):
+                self.take()
+                args = []
+                if self.peek() != ('op', ')'):
+                    args.append(self.parseSum())
+                    while self.peek() == ('op', ','):
+                        self.take()
+                        args.append(self.parseSum())
+                self.expect(')')
+                return ('call', text, args)
+            return ('name', text)
+        if (kind, text) == ('op', '('):
+            node = self.parseSum()
+            self.expect(')')
+            return node
+        if kind is None:
+            raise ExpressionError('unexpected end of {!r}'.format(self.expression))
+        raise ExpressionError('unexpected {!r} in {!r}'.format(text, self.expression))
+
+def parse(expression):
+    return _Parser(expression).parse()
+
+def _mathRound(value):
+    return math.floor(value + 0.5)
+
+# the functions of the math backend, an evaluator for arrays swaps them for
+# versions that work on whole arrays
+mathBackend = {
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'round': _mathRound,
+    'exp': math.exp,
+    'ln': math.log,
+    'log': math.log10,
+    'minimum': min,
+    'maximum': max,
+}
+
+constants = {
+    'PI': math.pi,
+    'pi': math.pi,
+    'E': math.e,
+}
+
+_trigFunctions = ('sin', 'cos', 'tan')
+_inverseTrigFunctions = ('asin', 'acos', 'atan')
+_plainFunctions = ('exp', 'ln', 'log')
+_roundingFunctions = ('abs', 'floor', 'ceil', 'round')
+
+class Evaluator(object):
+    # lookup(name) returns the Quantity of a parameter or None if there is no
+    # parameter of that name. defaultScales maps dimensions to the size of the
+    # unit a bare number is in when it is added to a value of those dimensions.
+    def __init__(self, lookup=None, backend=None, defaultScales=None):
+        self.lookup = lookup
+        self.backend = backend or mathBackend
+        self.defaultScales = defaultScales or {}
+
+    def scaleFor(self, dims):
+        if dims in self.defaultScales:
+            return self.defaultScales[dims]
+        return units.defaultScale(dims)
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == 'number':
+            return Quantity(node[1], units.DIMENSIONLESS)
+        if kind == 'name':
+            return self.evaluateName(node[1])
+        if kind == 'negate':
+            operand = self.evaluate(node[1])
+            return Quantity(-operand.value, operand.dims)
+        if kind == 'binary':
+            return self.evaluateBinary(node[1], node[2], node[3])
+        if kind == 'call':
+            return self.evaluateCall(node[1], [self.evaluate(arg) for arg in node[2]])
+        raise UnsupportedExpression('text values are not evaluated')
+
+    def evaluateName(self, name):
+        if self.lookup is not None:
+            value = self.lookup(name)
+            if value is not None:
+                return value
+        if name in units.units:
+            scale, dims = units.units[name]
+            return Quantity(scale, dims)
+        if name in constants:
+            return Quantity(constants[name], units.DIMENSIONLESS)
+        raise ExpressionError('unknown name ' + name)
+
+    def evaluateBinary(self, op, leftNode, rightNode):
+        left = self.evaluate(leftNode)
+        right = self.evaluate(rightNode)
+        if op in '+-':
+            # a bare number next to a length is a length in the default unit
+            if left.dims != right.dims:
+                if left.dims == units.DIMENSIONLESS:
+                    left = Quantity(left.value * self.scaleFor(right.dims), right.dims)
+                elif right.dims == units.DIMENSIONLESS:
+                    right = Quantity(right.value * self.scaleFor(left.dims), left.dims)
+                else:
+                    raise UnitConflict('cannot {} {} and {}'.format('add' if op == '+' else 'subtract', units.describeDims(left.dims), units.describeDims(right.dims)))
+            if op == '+':
+                return Quantity(left.value + right.value, left.dims)
+            return Quantity(left.value - right.value, left.dims)
+        if op == '*':
+            return Quantity(left.value * right.value, units.multiplyDims(left.dims, right.dims))
+        if op == '/':
+            return Quantity(left.value / right.value, units.divideDims(left.dims, right.dims))
+        # op == '^'
+        if right.dims != units.DIMENSIONLESS:
+            raise UnitConflict('the exponent has to be unitless')
+        if left.dims == units.DIMENSIONLESS:
+            return Quantity(left.value ** right.value, left.dims)
+        if rightNode[0] != 'number':
+            raise UnsupportedExpression('only a number can be used as exponent of a value with units')
+        dims = units.powerDims(left.dims, right.value)
+        if any(power != int(power) for power in dims):
+            raise UnitConflict('{} to the power of {} is not a unit'.format(units.describeDims(left.dims), right.value))
+        return Quantity(left.value ** right.value, tuple(int(power) for power in dims))
+
+    def evaluateCall(self, name, args):
+        backend = self.backend
+        if name in ('min', 'max'):
+            if not args:
+                raise ExpressionError(name + ' needs at least one value')
+            dims = args[0].dims
+            if any(arg.dims != dims for arg in args):
+                raise UnitConflict('the values of {} have different units'.format(name))
+            combine = backend['minimum' if name == 'min' else 'maximum']
+            value = args[0].value
+            for arg in args[1:]:
+                value = combine(value, arg.value)
+            return Quantity(value, dims)
+        if len(args) != 1:
+            if name in _trigFunctions + _inverseTrigFunctions + _plainFunctions + _roundingFunctions + ('sqrt',):
+                raise ExpressionError('{} takes one value'.format(name))
+            raise UnsupportedExpression('unknown function ' + name)
+        arg = args[0]
+        if name in _trigFunctions:
+            if arg.dims == units.DIMENSIONLESS:
+                arg = Quantity(arg.value * self.scaleFor(units.ANGLE), units.ANGLE)
+            if arg.dims != units.ANGLE:
+                raise UnitConflict('{} needs an angle, not a {}'.format(name, units.describeDims(arg.dims)))
+            return Quantity(backend[name](arg.value), units.DIMENSIONLESS)
+        if name in _inverseTrigFunctions:
+            if arg.dims != units.DIMENSIONLESS:
+                raise UnitConflict('{} needs a unitless value'.format(name))
+            return Quantity(backend[name](arg.value), units.ANGLE)
+        if name in _plainFunctions:
+            if arg.dims != units.DIMENSIONLESS:
+                raise UnitConflict('{} needs a unitless value'.format(name))
+            return Quantity(backend[name](arg.value), units.DIMENSIONLESS)
+        if name == 'sqrt':
+            if any(power % 2 for power in arg.dims):
+                raise UnitConflict('the square root of a {} is not a unit'.format(units.describeDims(arg.dims)))
+            return Quantity(backend['sqrt'](arg.value), tuple(power // 2 for power in arg.dims))
+        if name in _roundingFunctions:
+            # round in the unit the value is shown in, not in base units
+            scale = self.scaleFor(arg.dims)
+            return Quantity(backend[name](arg.value / scale) * scale, arg.dims)
+        raise UnsupportedExpression('unknown function ' + name)
+
+def unitQuantity(unit):
+    # the size and dimensions of a unit such as "mm", "mm^2" or "kg / m^3"
+    if not unit.strip():
+        return Quantity(1.0, units.DIMENSIONLESS)
+    try:
+        return Evaluator().evaluate(parse(unit))
+    except ExpressionError:
+        raise UnitConflict('unknown unit ' + unit)
+
+def evaluateParameter(expression, unit, lookup=None, backend=None):
+    # The value of a parameter's expression in base units. A bare number is
+    # taken to be in the parameter's unit, like Fusion does.
+    unitValue = unitQuantity(unit)
+    evaluator = Evaluator(lookup, backend, {unitValue.dims: unitValue.value})
+    result = evaluator.evaluate(parse(expression))
+    if result.dims == units.DIMENSIONLESS and unitValue.dims != units.DIMENSIONLESS:
+        return Quantity(result.value * unitValue.value, unitValue.dims)
+    if result.dims != unitValue.dims:
+        raise UnitConflict('the expression evaluates to {}, the unit {} is {}'.format(units.describeDims(result.dims), unit, units.describeDims(unitValue.dims)))
+    return result
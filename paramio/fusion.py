@@ -0,0 +1,162 @@
+# ParameterStore for a Fusion 360 design, the only part of paramio that needs adsk
+
+import math
+
+import adsk.core, adsk.fusion
+
+from . import expressions
+from .core import ParameterRow, normalizeComment
+from .snapshot import SnapshotRecord
+from .store import ParameterStore
+from .timing import nullTimer
+
+def rowFromParameter(_param):
+    try:
+        paramUnit = _param.unit
+    except:
+        paramUnit = ""
+    return ParameterRow(_param.name, paramUnit, _param.expression, _param.comment)
+
+def baseValue(_param, unit):
+    # Fusion's values are in cm for lengths, snapshots keep them in m
+    try:
+        dims = expressions.unitQuantity(unit).dims
+    except expressions.ExpressionError:
+        return math.nan
+    return _param.value * 0.01 ** dims[0]
+
+class FusionParameterStore(ParameterStore):
+    def __init__(self, design, timer=nullTimer):
+        self.design = design
+        self.timer = timer
+        # The parameters by name, built with a single pass over allParameters.
+        # _rows holds the unit, expression and comment captured from each one,
+        # _params the live parameter objects so updates don't need itemByName.
+        self._params = None
+        self._rows = None
+        self._wasDeferred = False
+
+    def rows(self):
+        count = 0
+        for _param in self.design.allParameters:
+            yield rowFromParameter(_param)
+            count += 1
+        self.timer.count('parameters read', count)
+
+    def records(self):
+        for _param in self.design.allParameters:
+            row = rowFromParameter(_param)
+            isUser = _param.objectType == adsk.fusion.UserParameter.classType()
+            yield SnapshotRecord(row.name, row.unit, row.expression, row.comment, baseValue(_param, row.unit), isUser, _param.isFavorite)
+
+    # The index is built once and then kept up to date by the add, remove and
+    # update calls, so planning import after import on the same store does not
+    # read all parameters again. Call refresh() when the parameters were changed
+    # outside of the store.
+    def snapshot(self):
+        if self._rows is not None:
+            return self._rows
+        self._params = {}
+        self._rows = {}
+        for _param in self.design.allParameters:
+            row = rowFromParameter(_param)
+            self._params[row.name] = _param
+            self._rows[row.name] = row
+        self.timer.count('parameters read', len(self._rows))
+        return self._rows
+
+    def refresh(self):
+        self._params = None
+        self._rows = None
+
+    def parameter(self, name):
+        if self._params is None:
+            self.snapshot()
+        return self._params[name]
+
+    def addParameter(self, row):
+        with self.timer.call('ValueInput.createByString'):
+            valInput_Param = adsk.core.ValueInput.createByString(row.expression)
+        with self.timer.call('userParameters.add'):
+            newParam = self.design.userParameters.add(row.name, valInput_Param, row.unit, normalizeComment(row.comment))
+        if self._params is not None:
+            self._params[row.name] = newParam
+            self._rows[row.name] = row._replace(comment=normalizeComment(row.comment))
+        return newParam
+
+    def removeParameter(self, name):
+        paramInModel = self.parameter(name)
+        if not paramInModel.deleteMe():
+            raise RuntimeError('Could not delete parameter ' + name)
+        del self._params[name]
+        del self._rows[name]
+
+    def updateParameter(self, row, fields):
+        paramInModel = self.parameter(row.name)
+        if 'unit' in fields:
+            with self.timer.call('Parameter.unit'):
+                paramInModel.unit = row.unit
+        if 'expression' in fields:
+            with self.timer.call('Parameter.expression'):
+                paramInModel.expression = row.expression
+        if 'comment' in fields:
+            with self.timer.call('Parameter.comment'):
+                paramInModel.comment = row.comment
+        self._rows[row.name] = self._rows[row.name]._replace(**dict((field, getattr(row, field)) for field in fields))
+
+    # switching the deferred compute back off makes Fusion do one recompute
+    # for all the edits made in between
+    def beginBatch(self):
+        self._wasDeferred = self.design.isComputeDeferred
+        self.design.isComputeDeferred = True
+
+    def endBatch(self):
+        self.design.isComputeDeferred = self._wasDeferred
+
+class DocumentStores(object):
+    # Finds the designs named in a batch manifest (see paramio.batch): an open
+    # document by name or a cloud file by its id. Documents the batch had to
+    # open are saved if they were changed and closed again, documents that
+    # were already open are left open for the user to check and save.
+    def __init__(self, app, saveOpened=True):
+        self.app = app
+        self.saveOpened = saveOpened
+        self._opened = {}
+
+    def findOpenDocument(self, reference):
+        for document in self.app.documents:
+            if document.name == reference:
+                return document
+            try:
+                if document.dataFile and document.dataFile.id == reference:
+                    return document
+            except:
+                # documents that were never saved have no data file
+                pass
+        return None
+
+    def open(self, reference):
+        document = self.findOpenDocument(reference)
+        openedHere = False
+        if not document:
+            dataFile = self.app.data.findFileById(reference)
+            if not dataFile:
+                raise ValueError('No open document or cloud file ' + reference)
+            document = self.app.documents.open(dataFile, True)
+            openedHere = True
+
+        design = document.products.itemByProductType('DesignProductType')
+        if not design:
+            raise ValueError(reference + ' is not a design')
+        store = FusionParameterStore(design)
+        if openedHere:
+            self._opened[id(store)] = document
+        return store
+
+    def close(self, store, changed):
+        document = self._opened.pop(id(store), None)
+        if not document:
+            return
+        if changed and self.saveOpened:
+            document.save('Parameters updated by Parameter I/O batch')
+        document.close(False)
@@ -0,0 +1,173 @@
+# Exporting only what changed since the last export to the same file.
+#
+# The exporter remembers, per target file, the fingerprint of every parameter
+# it wrote and the size and modification time the file had afterwards. When
+# the file wasn't touched since and no fingerprint changed nothing is read or
+# written at all. Otherwise the changes are either merged into the file,
+# keeping the order of its rows and any columns users added after the
+# comment, or written to a separate patch file.
+
+import collections
+import csv
+import os
+
+from . import csvio
+from .core import ParameterRow, normalizeComment
+from .timing import nullTimer
+
+# operations in a patch file, first column of each row: op,name,unit,expression,comment
+PATCH_ADD = 'add'
+PATCH_CHANGE = 'change'
+PATCH_REMOVE = 'remove'
+
+def fingerprint(row):
+    return (row.unit, row.expression, normalizeComment(row.comment))
+
+class ExportDelta(object):
+    def __init__(self):
+        # rows of parameters that are not in the file yet
+        self.added = []
+        # rows of parameters whose unit, expression or comment changed
+        self.changed = []
+        # names of parameters in the file that are no longer in the design
+        self.removed = []
+        # False when the file was already up to date and nothing was written
+        self.wrote = False
+
+    def isEmpty(self):
+        return not self.added and not self.changed and not self.removed
+
+    def describe(self):
+        return '{} added, {} changed, {} removed'.format(len(self.added), len(self.changed), len(self.removed))
+
+def _readTable(fileName):
+    # the rows of the file as lists, with every column, or None if there is no file
+    try:
+        with csvio.openText(fileName) as csvFile:
+            return list(csv.reader(csvFile, dialect=csv.excel))
+    except FileNotFoundError:
+        return None
+
+def _fingerprintsOfTable(table):
+    fingerprints = collections.OrderedDict()
+    for fields in table:
+        if len(fields) < 3:
+            continue
+        comment = fields[3] if len(fields) > 3 else ''
+        fingerprints[fields[0]] = fingerprint(ParameterRow(fields[0], fields[1], fields[2], comment))
+    return fingerprints
+
+def compare(rows, fingerprints):
+    delta = ExportDelta()
+    names = set()
+    for row in rows:
+        names.add(row.name)
+        previous = fingerprints.get(row.name)
+        if previous is None:
+            delta.added.append(row)
+        elif previous != fingerprint(row):
+            delta.changed.append(row)
+    delta.removed = [name for name in fingerprints if name not in names]
+    return delta
+
+def _mergedTable(table, delta):
+    changedRows = dict((row.name, row) for row in delta.changed)
+    removed = set(delta.removed)
+    merged = []
+    for fields in table:
+        name = fields[0] if len(fields) >= 3 else None
+        if name in removed:
+            continue
+        row = changedRows.get(name)
+        if row is not None:
+            # keep the columns users added after the comment
+            fields = list(row) + fields[4:]
+        merged.append(fields)
+    merged.extend(list(row) for row in delta.added)
+    return merged
+
+class IncrementalExporter(object):
+    def __init__(self):
+        # target file name -> (size, mtime) after our last write, {name: fingerprint}
+        self._targets = {}
+
+    def forget(self, fileName=None):
+        if fileName is None:
+            self._targets.clear()
+        else:
+            self._targets.pop(os.path.abspath(fileName), None)
+
+    def _baseline(self, path):
+        # the fingerprints the design is compared with and the rows of the file,
+        # the file is only read if it changed since we last wrote it
+        cached = self._targets.get(path)
+        if cached is not None and cached[0] == csvio.fileState(path):
+            return cached[1], None
+        table = _readTable(path)
+        if table is None:
+            return {}, None
+        return _fingerprintsOfTable(table), table
+
+    def export(self, store, fileName, timer=nullTimer):
+        # merge the changes into the file, returns an ExportDelta
+        path = os.path.abspath(fileName)
+        with timer.phase('resolve'):
+            rows = list(store.rows())
+            fingerprints, table = self._baseline(path)
+            delta = compare(rows, fingerprints)
+        timer.count('added', len(delta.added))
+        timer.count('changed', len(delta.changed))
+        timer.count('removed', len(delta.removed))
+
+        if not delta.isEmpty() or csvio.fileState(path) is None:
+            with timer.phase('write'):
+                if table is None:
+                    table = _readTable(path) or []
+                csvio.writeTable(path, _mergedTable(table, delta))
+            delta.wrote = True
+        self._remember(path, rows)
+        return delta
+
+    def exportPatch(self, store, fileName, patchFileName, timer=nullTimer):
+        # Write the changes since the last export or patch as a patch file of
+        # op,name,unit,expression,comment rows instead of touching fileName.
+        # No patch file is written when nothing changed.
+        path = os.path.abspath(fileName)
+        with timer.phase('resolve'):
+            rows = list(store.rows())
+            fingerprints, table = self._baseline(path)
+            delta = compare(rows, fingerprints)
+        timer.count('added', len(delta.added))
+        timer.count('changed', len(delta.changed))
+        timer.count('removed', len(delta.removed))
+
+        if not delta.isEmpty():
+            with timer.phase('write'):
+                patch = [[PATCH_ADD] + list(row) for row in delta.added]
+                patch.extend([PATCH_CHANGE] + list(row) for row in delta.changed)
+                patch.extend([PATCH_REMOVE, name, '', '', ''] for name in delta.removed)
+                csvio.writeTable(os.path.abspath(patchFileName), patch)
+            delta.wrote = True
+        self._remember(path, rows)
+        return delta
+
+    def _remember(self, path, rows):
+        self._targets[path] = (csvio.fileState(path), dict((row.name, fingerprint(row)) for row in rows))
+
+def applyPatch(fileName, patchFileName):
+    # merge a patch written by exportPatch into a parameter file
+    with csvio.openText(patchFileName) as patchFile:
+        patch = list(csv.reader(patchFile, dialect=csv.excel))
+    delta = ExportDelta()
+    for fields in patch:
+        op, row = fields[0], ParameterRow(*fields[1:5])
+        if op == PATCH_ADD:
+            delta.added.append(row)
+        elif op == PATCH_CHANGE:
+            delta.changed.append(row)
+        elif op == PATCH_REMOVE:
+            delta.removed.append(row.name)
+        else:
+            raise ValueError('unknown patch operation {!r} in {}'.format(op, patchFileName))
+    csvio.writeTable(os.path.abspath(fileName), _mergedTable(_readTable(fileName) or [], delta))
+    return delta
@@ -0,0 +1,106 @@
+# Dry run of an import: what it would add and change and which expressions
+# would fail, worked out on a snapshot without touching the parameters.
+
+import time
+
+from . import core, engine, expressions
+from .timing import nullTimer
+
+class ImportPlan(object):
+    def __init__(self):
+        # the ChangeSet the import would apply, in apply order
+        self.changes = None
+        # (name, field, current value, new value) for every field that would change
+        self.fieldChanges = []
+        # (name, message) for units that are unknown or don't fit the expression
+        self.unitConflicts = []
+        # (name, message) for expressions that would not evaluate
+        self.expressionErrors = []
+        # (name, reason) for expressions the local evaluator can't check
+        self.unchecked = []
+        # name -> expressions.Quantity of the added and updated parameters
+        self.values = {}
+        # the DependencyCycleError if parameters reference each other in a cycle
+        self.cycle = None
+        self.elapsed = 0.0
+
+    @property
+    def adds(self):
+        return self.changes.added
+
+    @property
+    def updates(self):
+        return self.changes.modified
+
+    def isValid(self):
+        return self.cycle is None and not self.unitConflicts and not self.expressionErrors
+
+    def problems(self):
+        lines = []
+        if self.cycle is not None:
+            lines.append(str(self.cycle))
+        for name, message in self.unitConflicts:
+            lines.append('{}: {}'.format(name, message))
+        for name, message in self.expressionErrors:
+            lines.append('{}: {}'.format(name, message))
+        return lines
+
+    def describe(self, maxProblems=20):
+        lines = [self.changes.describe()]
+        problems = self.problems()
+        lines.extend(problems[:maxProblems])
+        if len(problems) > maxProblems:
+            lines.append('... and {} more problems'.format(len(problems) - maxProblems))
+        return '\n'.join(lines)
+
+def checkExpressions(plan, current):
+    # Evaluate every added and updated parameter and the parameters they use,
+    # each after the ones its expression uses
+    changedRows = dict((row.name, row) for row, fields in plan.changes.inApplyOrder())
+    allExpressions = core.expressionsAfterImport(plan.changes, current)
+
+    def evaluate(name, lookup):
+        row = changedRows.get(name) or current[name]
+        return expressions.evaluateParameter(row.expression, row.unit, lookup)
+
+    for name, value, error in core.evaluateInOrder(plan.changes.order, allExpressions, evaluate):
+        # problems of parameters the import doesn't touch are not reported,
+        # they only make the ones using them unchecked
+        if name not in changedRows:
+            continue
+        if error is None:
+            plan.values[name] = value
+        elif isinstance(error, (core.Unresolved, expressions.UnsupportedExpression)):
+            plan.unchecked.append((name, str(error)))
+        elif isinstance(error, expressions.UnitConflict):
+            plan.unitConflicts.append((name, str(error)))
+        else:
+            plan.expressionErrors.append((name, str(error)))
+
+def previewImport(store, rows, timer=nullTimer):
+    start = time.perf_counter()
+    with timer.phase('resolve'):
+        plan = _plan(store, rows)
+    engine.countChanges(plan.changes, timer)
+    plan.elapsed = time.perf_counter() - start
+    return plan
+
+def _plan(store, rows):
+    plan = ImportPlan()
+    current = store.snapshot()
+    plan.changes = core.computeChangeSet(current, rows)
+    for row, fields in plan.changes.modified:
+        existing = plan.changes.previous[row.name]
+        for field in fields:
+            plan.fieldChanges.append((row.name, field, getattr(existing, field), getattr(row, field)))
+
+    try:
+        core.orderByDependencies(plan.changes, current)
+    except core.DependencyCycleError as error:
+        plan.cycle = error
+    else:
+        checkExpressions(plan, current)
+    return plan
+
+def previewFile(store, fileName, tableCache=None, timer=nullTimer):
+    return previewImport(store, engine.readFileRows(fileName, tableCache, timer), timer)
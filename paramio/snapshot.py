@@ -0,0 +1,274 @@
+# A compact columnar file format for parameter snapshots (.psnap).
+#
+# Unlike the CSV layout a snapshot keeps the evaluated value of every
+# parameter and whether it is a user parameter and a favorite. The columns
+# are stored one after the other so a reader can memory-map the file and only
+# touch the ones it needs:
+#
+#   header      b'PIOSNAP\0', version, parameter count, unit count (<8sIII)
+#   sections    offset and length of every section (<QQ each, see _sections)
+#   names       string block
+#   units       string block with every distinct unit once
+#   unitIds     uint32 per parameter, index into units
+#   values      float64 per parameter in base units (m, rad, kg, s), NaN if unknown
+#   flags       uint8 per parameter, FLAG_USER | FLAG_FAVORITE
+#   expressions string block
+#   comments    string block
+#
+# A string block is count + 1 uint32 offsets followed by the UTF-8 text of
+# all strings. Everything is little-endian and each section starts on an
+# 8 byte boundary so values can be viewed as float64 without copying. On a
+# big-endian machine the reader copies the number columns and swaps their bytes.
+
+import array
+import collections
+import math
+import mmap
+import struct
+import sys
+
+from . import core, csvio, expressions
+
+snapshotSuffix = '.psnap'
+
+MAGIC = b'PIOSNAP\x00'
+VERSION = 1
+
+FLAG_USER = 1
+FLAG_FAVORITE = 2
+
+_headerFormat = '<8sIII'
+_sectionFormat = '<QQ'
+_sections = ('names', 'units', 'unitIds', 'values', 'flags', 'expressions', 'comments')
+
+# a parameter with everything a snapshot keeps about it
+SnapshotRecord = collections.namedtuple('SnapshotRecord', ['name', 'unit', 'expression', 'comment', 'value', 'isUser', 'isFavorite'])
+
+def isSnapshotFile(fileName):
+    return fileName.lower().endswith(snapshotSuffix)
+
+def recordsFromRows(rows):
+    # Records for plain rows, the values worked out by the local evaluator.
+    # Rows from a CSV are taken to be user parameters.
+    rows = list(rows)
+    rowsByName = dict((row.name, row) for row in rows)
+    allExpressions = dict((row.name, row.expression) for row in rows)
+    def evaluate(name, lookup):
+        row = rowsByName[name]
+        return expressions.evaluateParameter(row.expression, row.unit, lookup)
+
+    values = {}
+    try:
+        for name, value, error in core.evaluateInOrder(list(rowsByName), allExpressions, evaluate):
+            if error is None:
+                values[name] = value
+    except core.DependencyCycleError:
+        pass
+    for row in rows:
+        value = values.get(row.name)
+        yield SnapshotRecord(row.name, row.unit, row.expression, row.comment, value.value if value else math.nan, True, False)
+
+def _littleEndian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+def _packStrings(strings):
+    offsets = array.array('I', [0])
+    encoded = []
+    position = 0
+    for text in strings:
+        data = text.encode('utf-8')
+        encoded.append(data)
+        position += len(data)
+        offsets.append(position)
+    return _littleEndian(offsets) + b''.join(encoded)
+
+def _pad(length):
+    return b'\x00' * (-length % 8)
+
+def writeSnapshot(outputFile, records):
+    # write the records to a binary file-like object, returns their number
+    names = []
+    unitIds = array.array('I')
+    units = []
+    unitIndex = {}
+    values = array.array('d')
+    flags = bytearray()
+    expressionTexts = []
+    comments = []
+    for record in records:
+        names.append(record.name)
+        if record.unit not in unitIndex:
+            unitIndex[record.unit] = len(units)
+            units.append(record.unit)
+        unitIds.append(unitIndex[record.unit])
+        values.append(record.value)
+        flags.append((FLAG_USER if record.isUser else 0) | (FLAG_FAVORITE if record.isFavorite else 0))
+        expressionTexts.append(record.expression)
+        comments.append(record.comment)
+
+    blocks = {
+        'names': _packStrings(names),
+        'units': _packStrings(units),
+        'unitIds': _littleEndian(unitIds),
+        'values': _littleEndian(values),
+        'flags': bytes(flags),
+        'expressions': _packStrings(expressionTexts),
+        'comments': _packStrings(comments)}
+
+    header = struct.pack(_headerFormat, MAGIC, VERSION, len(names), len(units))
+    position = len(header) + struct.calcsize(_sectionFormat) * len(_sections)
+    position += len(_pad(position))
+    table = []
+    for name in _sections:
+        table.append(struct.pack(_sectionFormat, position, len(blocks[name])))
+        position += len(blocks[name]) + len(_pad(len(blocks[name])))
+
+    start = header + b''.join(table)
+    outputFile.write(start + _pad(len(start)))
+    for name in _sections:
+        outputFile.write(blocks[name] + _pad(len(blocks[name])))
+    return len(names)
+
+def writeSnapshotFile(fileName, records):
+    with open(fileName, 'wb') as outputFile:
+        return writeSnapshot(outputFile, records)
+
+def _numberColumn(buffer, offset, length, typeCode):
+    # a memoryview of typeCode on the little-endian numbers of the file
+    view = buffer[offset:offset + length]
+    if sys.byteorder == 'little':
+        return view.cast(typeCode)
+    values = array.array(typeCode)
+    values.frombytes(view)
+    view.release()
+    values.byteswap()
+    return memoryview(values)
+
+class _StringBlock(object):
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offsets = _numberColumn(buffer, offset, 4 * (count + 1), 'I')
+        self._start = offset + 4 * (count + 1)
+
+    def __getitem__(self, index):
+        return bytes(self._buffer[self._start + self._offsets[index]:self._start + self._offsets[index + 1]]).decode('utf-8')
+
+    def release(self):
+        self._offsets.release()
+
+class SnapshotReader(object):
+    # Reads a snapshot through a memory map, only the parts that are asked
+    # for are loaded from disk. Use it as a context manager or call close.
+    def __init__(self, fileName):
+        self._file = open(fileName, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can't be mapped
+            self._file.close()
+            raise ValueError(fileName + ' is not a parameter snapshot')
+        self._buffer = memoryview(self._map)
+        magic, version, self.count, unitCount = struct.unpack_from(_headerFormat, self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(fileName + ' is not a parameter snapshot')
+        if version != VERSION:
+            self.close()
+            raise ValueError('{} is a version {} snapshot, only version {} can be read'.format(fileName, version, VERSION))
+        self._sections = {}
+        position = struct.calcsize(_headerFormat)
+        for name in _sections:
+            self._sections[name] = struct.unpack_from(_sectionFormat, self._map, position)
+            position += struct.calcsize(_sectionFormat)
+
+        self._names = _StringBlock(self._buffer, self._sections['names'][0], self.count)
+        self._units = _StringBlock(self._buffer, self._sections['units'][0], unitCount)
+        self._expressions = _StringBlock(self._buffer, self._sections['expressions'][0], self.count)
+        self._comments = _StringBlock(self._buffer, self._sections['comments'][0], self.count)
+        self._unitIds = self._column('unitIds', 'I')
+        self._values = self._column('values', 'd')
+        self._nameIndex = None
+
+    def _column(self, name, typeCode):
+        offset, length = self._sections[name]
+        return _numberColumn(self._buffer, offset, length, typeCode)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # this also releases the view returned by values()
+        for view in ('_names', '_units', '_expressions', '_comments'):
+            block = getattr(self, view, None)
+            if block is not None:
+                block.release()
+        for view in ('_unitIds', '_values', '_buffer'):
+            if getattr(self, view, None) is not None:
+                getattr(self, view).release()
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+        self._file.close()
+
+    def name(self, index):
+        return self._names[index]
+
+    def unit(self, index):
+        return self._units[self._unitIds[index]]
+
+    def expression(self, index):
+        return self._expressions[index]
+
+    def comment(self, index):
+        return self._comments[index]
+
+    def value(self, index):
+        return self._values[index]
+
+    def values(self):
+        # all values as a float64 memoryview on the file, nothing is copied on a
+        # little-endian machine
+        return self._values
+
+    def flags(self, index):
+        offset = self._sections['flags'][0]
+        return self._map[offset + index]
+
+    def index(self, name):
+        # the position of a parameter, the name index is built on first use
+        if self._nameIndex is None:
+            self._nameIndex = dict((self._names[index], index) for index in range(self.count))
+        return self._nameIndex[name]
+
+    def record(self, index):
+        flags = self.flags(index)
+        return SnapshotRecord(self.name(index), self.unit(index), self.expression(index), self.comment(index),
+                              self.value(index), bool(flags & FLAG_USER), bool(flags & FLAG_FAVORITE))
+
+    def records(self):
+        for index in range(self.count):
+            yield self.record(index)
+
+    def rows(self):
+        # the parameters in the CSV layout
+        for index in range(self.count):
+            yield core.ParameterRow(self.name(index), self.unit(index), self.expression(index), self.comment(index))
+
+def readSnapshotRows(fileName):
+    with SnapshotReader(fileName) as reader:
+        return list(reader.rows())
+
+def csvToSnapshot(csvFileName, snapshotFileName):
+    rows = csvio.readParameterFile(csvFileName)
+    return writeSnapshotFile(snapshotFileName, recordsFromRows(rows))
+
+def snapshotToCsv(snapshotFileName, csvFileName):
+    with SnapshotReader(snapshotFileName) as reader:
+        return csvio.writeParameterFile(csvFileName, reader.rows())
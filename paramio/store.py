@@ -0,0 +1,70 @@
+# The parameter stores the import and export work on. The Fusion add-in uses
+# FusionParameterStore (paramio/fusion.py), MemoryParameterStore lets the same
+# code run on plain data outside of Fusion.
+
+import collections
+
+from .core import normalizeComment
+from .timing import nullTimer
+
+class ParameterStore(object):
+    # the RunTimer the store reports the calls it makes to
+    timer = nullTimer
+
+    # Yield a ParameterRow for every parameter, one at a time
+    def rows(self):
+        raise NotImplementedError
+
+    # Yield a snapshot.SnapshotRecord for every parameter. By default the values
+    # come from the local evaluator, stores that know them do better.
+    def records(self):
+        from .snapshot import recordsFromRows
+        return recordsFromRows(self.rows())
+
+    # Return a dict of parameter name to ParameterRow. The store keeps it up
+    # to date as parameters are added and updated through it.
+    def snapshot(self):
+        raise NotImplementedError
+
+    def addParameter(self, row):
+        raise NotImplementedError
+
+    # Remove a parameter that was added through addParameter
+    def removeParameter(self, name):
+        raise NotImplementedError
+
+    # Set the given fields (see core.FIELDS) of an existing parameter from the row
+    def updateParameter(self, row, fields):
+        raise NotImplementedError
+
+    # Called around a group of edits, a store that recomputes after every edit
+    # can hold the recompute back until endBatch
+    def beginBatch(self):
+        pass
+
+    def endBatch(self):
+        pass
+
+class MemoryParameterStore(ParameterStore):
+    def __init__(self, rows=()):
+        self.parameters = collections.OrderedDict()
+        for row in rows:
+            self.parameters[row.name] = row
+
+    def rows(self):
+        return iter(list(self.parameters.values()))
+
+    def snapshot(self):
+        return self.parameters
+
+    def addParameter(self, row):
+        if row.name in self.parameters:
+            raise ValueError('Parameter name already exists: ' + row.name)
+        self.parameters[row.name] = row._replace(comment=normalizeComment(row.comment))
+
+    def removeParameter(self, name):
+        del self.parameters[name]
+
+    def updateParameter(self, row, fields):
+        existing = self.parameters[row.name]
+        self.parameters[row.name] = existing._replace(**dict((field, getattr(row, field)) for field in fields))
@@ -0,0 +1,84 @@
+# Timing the phases of an import or export and counting the calls made,
+# so a slow run shows where the time went.
+
+import collections
+import contextlib
+import json
+import time
+
+# the phases of a run, in the order they happen
+PHASES = ('validate', 'parse', 'resolve', 'apply', 'recompute', 'write')
+
+class RunTimer(object):
+    def __init__(self, operation, fileName=''):
+        self.operation = operation
+        self.fileName = fileName
+        self.started = time.time()
+        # phase name -> seconds
+        self.phases = collections.OrderedDict()
+        # call name -> [number of calls, seconds]
+        self.calls = collections.OrderedDict()
+        self.counters = collections.Counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    # time a single API call, calls happen within the phases and are kept apart from them
+    @contextlib.contextmanager
+    def call(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.calls.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def total(self):
+        return sum(self.phases.values())
+
+    def toDict(self):
+        return {
+            'operation': self.operation,
+            'file': self.fileName,
+            'started': self.started,
+            'total': self.total(),
+            'phases': dict(self.phases),
+            'calls': dict((name, {'count': count, 'seconds': seconds}) for name, (count, seconds) in self.calls.items()),
+            'counters': dict(self.counters)}
+
+    def summary(self):
+        lines = ['{} took {:.3f} s'.format(self.operation.capitalize(), self.total())]
+        for name in sorted(self.phases, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES)):
+            lines.append('  {}: {:.3f} s'.format(name, self.phases[name]))
+        for name, (count, seconds) in self.calls.items():
+            lines.append('  {}: {} calls, {:.3f} s'.format(name, count, seconds))
+        return '\n'.join(lines)
+
+    def writeLog(self, fileName):
+        # one JSON object per line, so runs can be appended to the same file
+        with open(fileName, 'a', encoding='utf-8') as logFile:
+            logFile.write(json.dumps(self.toDict(), sort_keys=True) + '\n')
+
+class NullTimer(object):
+    # stands in for a RunTimer when a run is not timed
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def call(self, name):
+        return self._context
+
+    def count(self, name, amount=1):
+        pass
+
+nullTimer = NullTimer()
@@ -0,0 +1,98 @@
+# The units parameters can have, with their size in base units (m, rad, kg, s).
+#
+# Dimensions are tuples of the powers of (length, angle, mass, time), so an
+# area is (2, 0, 0, 0) and a dimensionless value is (0, 0, 0, 0).
+
+import math
+
+DIMENSIONLESS = (0, 0, 0, 0)
+LENGTH = (1, 0, 0, 0)
+ANGLE = (0, 1, 0, 0)
+MASS = (0, 0, 1, 0)
+TIME = (0, 0, 0, 1)
+FORCE = (1, 0, 1, -2)
+PRESSURE = (-1, 0, 1, -2)
+
+_dimensionNames = ('length', 'angle', 'mass', 'time')
+
+# unit name -> (size in base units, dimensions)
+units = {
+    'nm': (1e-9, LENGTH),
+    'um': (1e-6, LENGTH),
+    'micron': (1e-6, LENGTH),
+    'mm': (1e-3, LENGTH),
+    'cm': (1e-2, LENGTH),
+    'dm': (1e-1, LENGTH),
+    'm': (1.0, LENGTH),
+    'km': (1e3, LENGTH),
+    'mil': (2.54e-5, LENGTH),
+    'in': (0.0254, LENGTH),
+    'inch': (0.0254, LENGTH),
+    'ft': (0.3048, LENGTH),
+    'foot': (0.3048, LENGTH),
+    'yd': (0.9144, LENGTH),
+    'mi': (1609.344, LENGTH),
+    'nmi': (1852.0, LENGTH),
+    'rad': (1.0, ANGLE),
+    'deg': (math.pi / 180, ANGLE),
+    'grad': (math.pi / 200, ANGLE),
+    'g': (1e-3, MASS),
+    'kg': (1.0, MASS),
+    'tonne': (1e3, MASS),
+    'ozmass': (0.028349523125, MASS),
+    'lbmass': (0.45359237, MASS),
+    'slug': (14.5939029372, MASS),
+    's': (1.0, TIME),
+    'sec': (1.0, TIME),
+    'min': (60.0, TIME),
+    'hr': (3600.0, TIME),
+    'N': (1.0, FORCE),
+    'kN': (1e3, FORCE),
+    'dyne': (1e-5, FORCE),
+    'lbf': (4.4482216152605, FORCE),
+    'ozf': (0.27801385095378125, FORCE),
+    'Pa': (1.0, PRESSURE),
+    'kPa': (1e3, PRESSURE),
+    'MPa': (1e6, PRESSURE),
+    'GPa': (1e9, PRESSURE),
+    'psi': (6894.757293168361, PRESSURE),
+    'ksi': (6894757.293168361, PRESSURE),
+}
+
+# the unit a bare number is taken to be in when it is combined with a value
+# of these dimensions and the parameter does not say otherwise
+defaultUnits = {
+    LENGTH: 'mm',
+    ANGLE: 'deg',
+    MASS: 'kg',
+    TIME: 's',
+}
+
+def defaultScale(dims):
+    unit = defaultUnits.get(dims)
+    if unit is None:
+        return 1.0
+    return units[unit][0]
+
+def isKnownUnit(name):
+    return name in units
+
+def describeDims(dims):
+    if dims == DIMENSIONLESS:
+        return 'unitless'
+    parts = []
+    for name, power in zip(_dimensionNames, dims):
+        if power == 1:
+            parts.append(name)
+        elif power:
+            parts.append('{}^{}'.format(name, power))
+    return ' * '.join(parts)
+
+def multiplyDims(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+def divideDims(a, b):
+    return tuple(x - y for x, y in zip(a, b))
+
+def powerDims(dims, exponent):
+    return tuple(power * exponent for power in dims)
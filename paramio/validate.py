@@ -0,0 +1,230 @@
+# Checking a parameter file before anything is imported from it: every row
+# needs a legal, unique name and an expression that parses. A unit this
+# module does not know is only a warning, Fusion knows more of them.
+#
+# The file is streamed in chunks of rows. Small files are checked in this
+# process, once a file needs more than one chunk the chunks are checked in a
+# pool of processes while the next ones are read. Only a bounded number of
+# chunks and problems are held in memory, all problems can be streamed to a
+# report file.
+
+import collections
+import concurrent.futures
+import csv
+import os
+import re
+import time
+
+from . import csvio, expressions, units
+
+# a problem found on a line of the file, warnings don't make the file invalid
+Problem = collections.namedtuple('Problem', ['line', 'name', 'message', 'isWarning'], defaults=(False,))
+
+_namePattern = re.compile(r'[^\W\d]\w*\Z')
+
+# most expressions are a number with or without a unit, they don't need the parser
+_plainValuePattern = re.compile(r'\s*-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\s*(?P<unit>[^\W\d]\w*)?\s*\Z')
+
+reportHeader = ['line', 'name', 'problem', 'level']
+
+def checkName(name):
+    # the reason the name can't be a parameter name, or None
+    if not name:
+        return 'the name is missing'
+    if not _namePattern.match(name):
+        return '{!r} is not a legal parameter name, use letters, digits and _ and start with a letter'.format(name)
+    if units.isKnownUnit(name):
+        return '{} is the name of a unit'.format(name)
+    return None
+
+def checkUnit(unit, unitCache):
+    # The warning for a unit that is not in units.py, or None. unitCache keeps
+    # what was found for the units already seen, most files only use a few.
+    if unit not in unitCache:
+        try:
+            expressions.unitQuantity(unit)
+            unitCache[unit] = None
+        except expressions.ExpressionError:
+            unitCache[unit] = 'unknown unit {!r}, it is not checked'.format(unit)
+    return unitCache[unit]
+
+def checkRow(row):
+    # the problems of one CSV row that stop it from being imported, as messages
+    if len(row) < 3:
+        return ['expected name,unit,expression[,comment] but found {} column{}'.format(len(row), '' if len(row) == 1 else 's')]
+    messages = []
+    nameMessage = checkName(row[0])
+    if nameMessage:
+        messages.append(nameMessage)
+    plainValue = _plainValuePattern.match(row[2])
+    if plainValue and (plainValue.group('unit') is None or units.isKnownUnit(plainValue.group('unit'))):
+        pass
+    elif not row[2].strip():
+        messages.append('the expression is missing')
+    else:
+        try:
+            expressions.parse(row[2])
+        except expressions.ExpressionError as error:
+            messages.append('the expression {!r} does not parse: {}'.format(row[2], error))
+    return messages
+
+def checkChunk(chunk):
+    # chunk is a list of (line number, row), returns the Problems in it
+    problems = []
+    unitCache = {}
+    for lineNumber, row in chunk:
+        name = row[0] if row else ''
+        for message in checkRow(row):
+            problems.append(Problem(lineNumber, name, message))
+        unitMessage = checkUnit(row[1], unitCache) if len(row) >= 3 else None
+        if unitMessage:
+            problems.append(Problem(lineNumber, name, unitMessage, True))
+    return problems
+
+class ValidationReport(object):
+    def __init__(self, fileName, maxProblems):
+        self.fileName = fileName
+        self.maxProblems = maxProblems
+        self.rowCount = 0
+        self.problemCount = 0
+        self.warningCount = 0
+        # the first maxProblems problems and warnings, in line order
+        self.problems = []
+        # the file all problems were written to, None if there were none
+        self.reportFileName = None
+        self.elapsed = 0.0
+
+    def isValid(self):
+        return self.problemCount == 0
+
+    def describe(self, maxProblems=20):
+        found = '{} problems'.format(self.problemCount) if self.problemCount else 'no problems'
+        summary = '{} rows checked, {} found'.format(self.rowCount, found)
+        if self.warningCount:
+            summary += ', {} warnings'.format(self.warningCount)
+        lines = [summary]
+        shown = self.problems[:maxProblems]
+        for problem in shown:
+            lines.append('line {}: {}{}'.format(problem.line, 'warning: ' if problem.isWarning else '', problem.message))
+        hidden = self.problemCount + self.warningCount - len(shown)
+        if hidden > 0:
+            lines.append('... and {} more problems'.format(hidden))
+        return '\n'.join(lines)
+
+class _ReportWriter(object):
+    # collects the problems in the report and, if a report file is given,
+    # writes all of them to it. The file is only created once there is a problem.
+    def __init__(self, report, reportFileName):
+        self.report = report
+        self.reportFileName = reportFileName
+        self.reportFile = None
+        self.csvWriter = None
+
+    def add(self, problems):
+        report = self.report
+        warningCount = len([problem for problem in problems if problem.isWarning])
+        report.problemCount += len(problems) - warningCount
+        report.warningCount += warningCount
+        room = report.maxProblems - len(report.problems)
+        if room > 0:
+            report.problems.extend(problems[:room])
+        if self.reportFileName and problems:
+            if self.reportFile is None:
+                self.reportFile = csvio.openText(self.reportFileName, 'w')
+                self.csvWriter = csv.writer(self.reportFile, dialect=csv.excel, lineterminator='\n')
+                self.csvWriter.writerow(reportHeader)
+                report.reportFileName = self.reportFileName
+            self.csvWriter.writerows([problem.line, problem.name, problem.message, 'warning' if problem.isWarning else 'error']
+                                     for problem in problems)
+
+    def close(self):
+        if self.reportFile is not None:
+            self.reportFile.close()
+
+def _readChunks(csvFile, chunkRows, report):
+    # Yield (chunk, readProblems) where chunk is a list of (line number, row)
+    # and readProblems the Problems found while reading it: names already used
+    # on an earlier line and lines that could not be read
+    csvReader = csv.reader(csvFile, dialect=csv.excel)
+    firstLines = {}
+    chunk = []
+    readProblems = []
+    lineNumber = 0
+    while True:
+        try:
+            row = next(csvReader, None)
+        except (csv.Error, UnicodeDecodeError, EOFError, OSError) as error:
+            # the rest of the file can't be read reliably
+            readProblems.append(Problem(csvReader.line_num or lineNumber + 1, '', 'the file can not be read from here on: {}'.format(error)))
+            break
+        if row is None:
+            break
+        # a row starts on the line after the previous row ended, quoted fields can span lines
+        rowLineNumber = lineNumber + 1
+        lineNumber = csvReader.line_num
+        # skip blank lines
+        if not row:
+            continue
+        report.rowCount += 1
+        name = row[0]
+        if name in firstLines:
+            readProblems.append(Problem(rowLineNumber, name, '{} is already on line {}'.format(name, firstLines[name])))
+        elif name:
+            firstLines[name] = rowLineNumber
+        chunk.append((rowLineNumber, row))
+        if len(chunk) >= chunkRows:
+            yield chunk, readProblems
+            chunk = []
+            readProblems = []
+    if chunk or readProblems:
+        yield chunk, readProblems
+
+def _merge(problems, readProblems):
+    if not readProblems:
+        return problems
+    return sorted(problems + readProblems, key=lambda problem: problem.line)
+
+def validateRows(csvFile, fileName='', maxWorkers=None, chunkRows=20000, maxProblems=1000, reportFileName=None):
+    # Check the rows of an open CSV file, see validateFile
+    start = time.perf_counter()
+    report = ValidationReport(fileName, maxProblems)
+    writer = _ReportWriter(report, reportFileName)
+    workers = maxWorkers if maxWorkers is not None else (os.cpu_count() or 1)
+    executor = None
+    # chunks being checked, in the order they were read, so the problems come out in line order
+    pending = collections.deque()
+    try:
+        for chunk, readProblems in _readChunks(csvFile, chunkRows, report):
+            if workers <= 1:
+                writer.add(_merge(checkChunk(chunk), readProblems))
+                continue
+            pending.append((chunk, readProblems))
+            # a file that fits in one chunk is not worth starting the processes
+            if executor is None and len(pending) > 1:
+                executor = concurrent.futures.ProcessPoolExecutor(workers)
+                pending = collections.deque((executor.submit(checkChunk, chunk), readProblems) for chunk, readProblems in pending)
+            elif executor is not None:
+                pending[-1] = (executor.submit(checkChunk, chunk), readProblems)
+            # keep the number of chunks in memory bounded
+            while executor is not None and len(pending) > 2 * workers:
+                future, pendingReadProblems = pending.popleft()
+                writer.add(_merge(future.result(), pendingReadProblems))
+        for checking, pendingReadProblems in pending:
+            problems = checking.result() if executor is not None else checkChunk(checking)
+            writer.add(_merge(problems, pendingReadProblems))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        writer.close()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def validateFile(fileName, maxWorkers=None, chunkRows=20000, maxProblems=1000, reportFileName=None):
+    # Check a parameter file in the name, unit, expression, comment layout.
+    # maxWorkers=0 or 1 checks it in this process. With reportFileName every
+    # problem and warning is written to that CSV file, a report left from an
+    # earlier check is removed when there are none anymore.
+    if reportFileName and os.path.exists(reportFileName):
+        os.remove(reportFileName)
+    with csvio.openText(fileName) as csvFile:
+        return validateRows(csvFile, fileName, maxWorkers, chunkRows, maxProblems, reportFileName)
@@ -0,0 +1,200 @@
+# Evaluating many variants of a parameter table at once, outside of Fusion.
+#
+# A variants file is a CSV with a header row of parameter names and one row
+# per variant giving the expressions those parameters have in it, e.g.
+#
+#   variant,Width,Height
+#   small,10 mm,20 mm
+#   wide,40 mm,Width / 2
+#
+# The first column is the name of the variant if its header is "variant".
+# Every parameter is evaluated once for all variants with NumPy arrays, so
+# a table of thousands of variants costs about as much as a few of them.
+# NumPy is only needed for this module.
+
+import csv
+
+from . import core, csvio, expressions, units
+
+def loadNumpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('Evaluating variants needs NumPy, install it with "pip install numpy"')
+    return numpy
+
+def numpyBackend(numpy):
+    # the functions of expressions.mathBackend for arrays
+    return {
+        'sin': numpy.sin,
+        'cos': numpy.cos,
+        'tan': numpy.tan,
+        'asin': numpy.arcsin,
+        'acos': numpy.arccos,
+        'atan': numpy.arctan,
+        'sqrt': numpy.sqrt,
+        'abs': numpy.abs,
+        'floor': numpy.floor,
+        'ceil': numpy.ceil,
+        'round': lambda value: numpy.floor(value + 0.5),
+        'exp': numpy.exp,
+        'ln': numpy.log,
+        'log': numpy.log10,
+        'minimum': numpy.minimum,
+        'maximum': numpy.maximum,
+    }
+
+class VariantTable(object):
+    def __init__(self, variantNames, columns):
+        # one name per variant
+        self.variantNames = variantNames
+        # parameter name -> list with the expression of every variant, an
+        # empty one keeps the expression the parameter has in the table
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.variantNames)
+
+def readVariants(fileName):
+    with csvio.openText(fileName) as csvFile:
+        table = [row for row in csv.reader(csvFile, dialect=csv.excel) if row]
+    if not table:
+        return VariantTable([], {})
+    header = [name.strip() for name in table[0]]
+    hasNames = header[0].lower() == 'variant'
+    names = header[1:] if hasNames else header
+    variantNames = []
+    columns = dict((name, []) for name in names)
+    for lineNumber, row in enumerate(table[1:], 2):
+        cells = row[1:] if hasNames else row
+        if len(cells) != len(names):
+            raise ValueError('{} line {}: expected {} values, found {}'.format(fileName, lineNumber, len(names), len(cells)))
+        variantNames.append(row[0] if hasNames else str(lineNumber - 1))
+        for name, cell in zip(names, cells):
+            columns[name].append(cell.strip())
+    return VariantTable(variantNames, columns)
+
+class VariantResult(object):
+    def __init__(self, variantNames):
+        self.variantNames = variantNames
+        # name -> array with the value in base units for every variant (NaN where it failed)
+        self.values = {}
+        # name -> dimensions of the values
+        self.dims = {}
+        # name -> unit of the parameter
+        self.units = {}
+        # name -> why the parameter could not be evaluated
+        self.errors = {}
+        # name -> (expression, why) for expressions of single variants that failed,
+        # the variants using them are NaN
+        self.cellErrors = {}
+
+    def valuesIn(self, name, unit=None):
+        # the values of a parameter in its own unit or the given one
+        scale = expressions.unitQuantity(unit if unit is not None else self.units[name]).value
+        return self.values[name] / scale
+
+    def variant(self, index):
+        return dict((name, values[index]) for name, values in self.values.items())
+
+    def writeCsv(self, fileName):
+        # one row per variant, one column per parameter in the parameter's unit
+        names = list(self.values)
+        columns = [self.valuesIn(name) for name in names]
+        with csvio.openText(fileName, 'w') as outputFile:
+            csvWriter = csv.writer(outputFile, dialect=csv.excel, lineterminator='\n')
+            csvWriter.writerow(['variant'] + ['{} ({})'.format(name, self.units[name]) if self.units[name] else name for name in names])
+            for index, variantName in enumerate(self.variantNames):
+                csvWriter.writerow([variantName] + [repr(float(column[index])) for column in columns])
+
+def evaluateVariants(rows, variants, numpy=None):
+    # Evaluate every parameter of rows for every variant in variants. Returns a
+    # VariantResult, parameters that fail are NaN and listed in its errors.
+    numpy = numpy or loadNumpy()
+    backend = numpyBackend(numpy)
+    count = len(variants)
+    rowsByName = dict((row.name, row) for row in rows)
+    columns = {}
+    for name, cells in variants.columns.items():
+        if name not in rowsByName:
+            raise ValueError('the variants set {} which is not a parameter of the table'.format(name))
+        columns[name] = [cell or rowsByName[name].expression for cell in cells]
+
+    # a parameter that differs between variants depends on what any of its expressions use
+    allExpressions = dict((name, row.expression) for name, row in rowsByName.items())
+    for name, cells in columns.items():
+        allExpressions[name] = ' , '.join(set(cells))
+
+    result = VariantResult(variants.variantNames)
+    def evaluate(name, lookup):
+        row = rowsByName[name]
+        if name in columns:
+            cellErrors = []
+            quantity = _evaluateColumn(row.unit, columns[name], lookup, backend, numpy, count, cellErrors)
+            if cellErrors:
+                result.cellErrors[name] = cellErrors
+        else:
+            quantity = expressions.evaluateParameter(row.expression, row.unit, lookup, backend)
+        value = numpy.broadcast_to(numpy.asarray(quantity.value, dtype=float), (count,))
+        return expressions.Quantity(value, quantity.dims)
+
+    values = {}
+    with numpy.errstate(all='ignore'):
+        for name, value, error in core.evaluateInOrder(list(rowsByName), allExpressions, evaluate):
+            result.units[name] = rowsByName[name].unit
+            if error is None:
+                values[name] = value
+            else:
+                result.errors[name] = str(error)
+
+    for name in rowsByName:
+        if name in values:
+            result.values[name] = values[name].value
+            result.dims[name] = values[name].dims
+        else:
+            result.values[name] = numpy.full(count, numpy.nan)
+    return result
+
+def _evaluateColumn(unit, cells, lookup, backend, numpy, count, cellErrors):
+    # Each distinct expression of the column is evaluated once for all
+    # variants. Constants are spread to their variants in one step, for
+    # expressions using other parameters the variants pick their own element.
+    # Expressions that fail leave their variants NaN and go to cellErrors.
+    distinct, inverse = numpy.unique(numpy.asarray(cells, dtype=str), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    constants = numpy.full(len(distinct), numpy.nan)
+    varying = []
+    dims = None
+    for position, expression in enumerate(distinct.tolist()):
+        try:
+            quantity = expressions.evaluateParameter(expression, unit, lookup, backend)
+            if dims is not None and quantity.dims != dims:
+                raise expressions.UnitConflict('the expression evaluates to {} while other variants give {}'.format(units.describeDims(quantity.dims), units.describeDims(dims)))
+        except (expressions.ExpressionError, ArithmeticError) as error:
+            cellErrors.append((expression, str(error)))
+            continue
+        dims = quantity.dims
+        if numpy.ndim(quantity.value) == 0:
+            constants[position] = quantity.value
+        else:
+            varying.append((position, quantity.value))
+    if dims is None:
+        raise expressions.ExpressionError(cellErrors[0][1])
+
+    value = constants[inverse]
+    for position, array in varying:
+        mask = inverse == position
+        value[mask] = numpy.broadcast_to(array, (count,))[mask]
+    return expressions.Quantity(value, dims)
+
+def variantRows(rows, variants, index):
+    # the parameter table of one variant, ready to be imported
+    for row in rows:
+        cells = variants.columns.get(row.name)
+        if cells is None:
+            yield row
+        else:
+            yield row._replace(expression=cells[index] or row.expression)
+
+def writeVariantCsv(fileName, rows, variants, index):
+    return csvio.writeParameterFile(fileName, variantRows(rows, variants, index))
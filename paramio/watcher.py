@@ -0,0 +1,174 @@
+# Keeping a CSV file in sync with a design from a background thread.
+#
+# Fusion's API may only be used from the main thread, so the work is split:
+# the main thread reports parameter changes with markDirty and, when asked
+# through post('export'), reads the parameters and hands them over with
+# exportRows, or calls exportFailed when it can't. The worker thread waits
+# until the changes have settled for the debounce window, asks for the rows
+# and writes the file, so the main thread never waits on the disk. It also
+# polls the file and, once an outside change has settled, asks for
+# post('import'), at most once per minImportInterval so a file that keeps
+# changing doesn't make the model recompute over and over.
+#
+# An outside change always wins: nothing is exported while a change to the
+# file is waiting to be imported or the import refused it, and rows that
+# arrive after the file changed on disk are not written over it. The design
+# is exported again once the file was imported.
+
+import logging
+import os
+import threading
+import time
+
+from . import csvio, incremental
+from .store import MemoryParameterStore
+
+logger = logging.getLogger(__name__)
+
+class ParameterSync(object):
+    # post(action) is called from the worker thread and has to get the main
+    # thread to call exportRows ('export') or to import the file and then call
+    # importDone ('import'). In Fusion that is a custom event.
+    def __init__(self, fileName, post, debounce=2.0, minImportInterval=10.0, pollInterval=1.0):
+        self.fileName = os.path.abspath(fileName)
+        self.post = post
+        self.debounce = debounce
+        self.minImportInterval = minImportInterval
+        self.pollInterval = pollInterval
+        self.exporter = incremental.IncrementalExporter()
+        self.exports = 0
+        # exports that were not written because the file had changed on disk
+        self.conflicts = 0
+        self.lastError = None
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        # time of the last change reported by markDirty that was not exported yet
+        self._lastDirty = None
+        self._exportRequested = False
+        self._pendingRows = None
+        # the state of the file as last written or seen, and when it changed from outside
+        self._fileState = csvio.fileState(self.fileName)
+        self._fileChangedAt = None
+        self._importRequested = False
+        self._lastImport = None
+        # the last import did not apply the file, it is left alone until it changes
+        self._importRefused = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='ParameterSync', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        # rows that were handed over already are still written
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # the following are called from the main thread
+
+    def markDirty(self):
+        with self._condition:
+            self._lastDirty = time.monotonic()
+            self._condition.notify()
+
+    def exportRows(self, rows):
+        rows = list(rows)
+        with self._condition:
+            self._pendingRows = rows
+            self._exportRequested = False
+            self._condition.notify()
+
+    # the main thread could not hand over the rows asked for, the next change
+    # asks again
+    def exportFailed(self):
+        with self._condition:
+            self._exportRequested = False
+
+    # imported is False when the file was not applied to the design, for
+    # instance because it does not validate
+    def importDone(self, imported=True):
+        with self._condition:
+            self._importRequested = False
+            self._importRefused = not imported
+            self._lastImport = time.monotonic()
+            self._condition.notify()
+
+    # the worker thread
+
+    def _exportBlocked(self):
+        # called with the condition held
+        return self._exportRequested or self._importRequested or self._importRefused or self._fileChangedAt is not None
+
+    def _timeout(self, now):
+        if self._lastDirty is None or self._exportBlocked():
+            return self.pollInterval
+        return min(self.pollInterval, max(0.0, self._lastDirty + self.debounce - now))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._pendingRows is None and not self._stopping:
+                    self._condition.wait(self._timeout(time.monotonic()))
+                rows = self._pendingRows
+                self._pendingRows = None
+                stopping = self._stopping
+                now = time.monotonic()
+                requestExport = False
+                if self._lastDirty is not None and not self._exportBlocked() and now - self._lastDirty >= self.debounce:
+                    self._lastDirty = None
+                    self._exportRequested = True
+                    requestExport = True
+
+            if rows is not None:
+                self._write(rows)
+            if stopping:
+                return
+            if requestExport:
+                self.post('export')
+            self._pollFile(now)
+
+    def _write(self, rows):
+        with self._condition:
+            fileIsAhead = self._importRequested or self._importRefused or self._fileChangedAt is not None
+            if fileIsAhead or csvio.fileState(self.fileName) != self._fileState:
+                # the file changed since it was last seen, it is imported first
+                # and the design exported again after that
+                self.conflicts += 1
+                logger.warning('%s changed on disk, not exporting over it', self.fileName)
+                if self._lastDirty is None:
+                    self._lastDirty = time.monotonic()
+                return
+        try:
+            delta = self.exporter.export(MemoryParameterStore(rows), self.fileName)
+            if delta.wrote:
+                self.exports += 1
+                logger.info('Wrote %s to %s', delta.describe(), self.fileName)
+        except Exception as error:
+            self.lastError = error
+            logger.warning('Could not write %s', self.fileName, exc_info=True)
+        # our own write is not a change to import
+        self._fileState = csvio.fileState(self.fileName)
+
+    def _pollFile(self, now):
+        state = csvio.fileState(self.fileName)
+        if state != self._fileState:
+            self._fileState = state
+            # a deleted file has nothing to import, the next export writes it again
+            self._fileChangedAt = now if state is not None else None
+            with self._condition:
+                self._importRefused = False
+            return
+        if self._fileChangedAt is None or state is None or now - self._fileChangedAt < self.debounce:
+            return
+        with self._condition:
+            if self._importRequested:
+                return
+            if self._lastImport is not None and now - self._lastImport < self.minImportInterval:
+                return
+            self._importRequested = True
+        self._fileChangedAt = None
+        self.post('import')
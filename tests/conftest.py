@@ -0,0 +1,11 @@
+# paramio is imported from the repository, adsk from the stand-in in benchmarks
+
+import os
+import sys
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+repoDir = os.path.dirname(testDir)
+
+for path in (repoDir, os.path.join(repoDir, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
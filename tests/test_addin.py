@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import adsk
+import adsk.core
+
+import harness
+
+class AddinImportTest(unittest.TestCase):
+    def setUp(self):
+        self.addin = harness.loadAddin()
+        self.addin.timingLogFile = None
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.design = harness.newDesign(2)
+        self.ui = adsk.core.Application.get().userInterface
+        del self.ui.messages[:]
+        self.addCleanup(setattr, self.ui, 'answer', adsk.core.DialogResults.DialogYes)
+
+    def csvFile(self, text):
+        fileName = os.path.join(self.folder, 'params.csv')
+        with open(fileName, 'w') as csvFile:
+            csvFile.write(text)
+        return fileName
+
+    def parameters(self):
+        return [(param.name, param.expression) for param in self.design.allParameters]
+
+    def testImportReportsThatItApplied(self):
+        fileName = self.csvFile('p0,mm,20 mm,comment 0\nDepth,mm,p0 / 2,\n')
+        self.assertTrue(self.addin.readTheParameters(fileName))
+        self.assertEqual(self.parameters(), [('p0', '20 mm'), ('p1', '2 mm'), ('Depth', 'p0 / 2')])
+        self.assertTrue(self.ui.messages[-1].startswith('Finished reading and updating parameters'))
+        # a file the design already matches is in sync as well
+        self.assertTrue(self.addin.readTheParameters(fileName))
+
+    def testRefusedImportReportsThatItDidNot(self):
+        fileName = self.csvFile('p0,mm,20 mm,comment 0\n1st,mm,1 mm,\n')
+        self.assertFalse(self.addin.readTheParameters(fileName))
+        self.assertTrue(self.ui.messages[-1].startswith('Nothing was imported'))
+        self.assertEqual(self.parameters(), [('p0', '1 mm'), ('p1', '2 mm')])
+
+    def testImportAnywayFollowsTheAnswer(self):
+        fileName = self.csvFile('p0,deg,20 mm,comment 0\n')
+        self.ui.answer = adsk.core.DialogResults.DialogNo
+        self.assertFalse(self.addin.readTheParameters(fileName))
+        self.assertTrue(self.ui.messages[-1].endswith('Import anyway?'))
+        self.assertEqual(self.parameters(), [('p0', '1 mm'), ('p1', '2 mm')])
+        self.ui.answer = adsk.core.DialogResults.DialogYes
+        self.assertTrue(self.addin.readTheParameters(fileName))
+        self.assertEqual(self.parameters(), [('p0', '20 mm'), ('p1', '2 mm')])
+
+    def testExportImportsBack(self):
+        self.design.addParameter('F', 'N', '10 N', 'force')
+        self.design.addParameter('P', 'psi', 'F / 1 in^2', '')
+        self.design.addParameter('T', 'min', '2', '')
+        fileName = os.path.join(self.folder, 'export.csv')
+        self.assertTrue(self.addin.writeTheParameters(fileName))
+        exported = self.parameters()
+        for param in self.design.allParameters:
+            param.expression = '1 ' + param.unit
+        self.assertTrue(self.addin.readTheParameters(fileName))
+        self.assertTrue(self.ui.messages[-1].startswith('Finished reading and updating parameters'), self.ui.messages[-1])
+        self.assertEqual(self.parameters(), exported)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from paramio import batch, csvio
+from paramio.core import ParameterRow
+from paramio.store import MemoryParameterStore
+
+from test_engine import RecordingStore, originalRows
+
+class RecordingStores(batch.MemoryStores):
+    # records how every design was closed, like fusion.DocumentStores saves
+    # the documents that were closed as changed
+    def __init__(self, stores):
+        super().__init__(stores)
+        self.closed = []
+
+    def close(self, store, changed):
+        name = [name for name, candidate in self.stores.items() if candidate is store][0]
+        self.closed.append((name, changed))
+
+class RunBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def csvFile(self, name, rows):
+        fileName = os.path.join(self.folder, name)
+        csvio.writeParameterFile(fileName, rows)
+        return fileName
+
+    def testFailedImportClosesWithoutSaving(self):
+        fileName = self.csvFile('params.csv', [
+            ParameterRow('Width', 'in', '1 in', 'changed'),
+            ParameterRow('Length', 'mm', '5 mm', ' '),
+            ParameterRow('Depth', 'mm', '7 mm', ' ')])
+        stores = RecordingStores({
+            'good': RecordingStore(originalRows()),
+            'bad': RecordingStore(originalRows(), failAdd=('Depth',)),
+            'rollbackFails': RecordingStore(originalRows(), failAdd=('Depth',), failRemove=True)})
+        entries = [batch.BatchEntry(name, fileName, 'import') for name in ('good', 'bad', 'rollbackFails')]
+        results = batch.runBatch(entries, stores)
+
+        self.assertEqual(stores.closed, [('good', True), ('bad', False), ('rollbackFails', False)])
+        self.assertIsNone(results[0].error)
+        self.assertIn('Depth', results[1].error)
+        self.assertIn('Restoring the parameters failed too', results[2].error)
+        self.assertEqual(list(stores.stores['bad'].rows()), originalRows())
+
+    def testUnchangedImportAndExportAreNotSaved(self):
+        fileName = self.csvFile('params.csv', originalRows())
+        exportName = os.path.join(self.folder, 'export.csv')
+        stores = RecordingStores({'design': MemoryParameterStore(originalRows())})
+        results = batch.runBatch([
+            batch.BatchEntry('design', fileName, 'import'),
+            batch.BatchEntry('design', exportName, 'export')], stores)
+        self.assertEqual(stores.closed, [('design', False), ('design', False)])
+        self.assertEqual(results[1].exported, 3)
+        self.assertEqual(csvio.readParameterFile(exportName), originalRows())
+
+    def testFileThatCannotBeOpenedIsRecorded(self):
+        stores = RecordingStores({})
+        results = batch.runBatch([batch.BatchEntry('missing', 'params.csv', 'import')], stores)
+        self.assertIn('Could not open design', results[0].error)
+        self.assertEqual(stores.closed, [])
+
+    def testManifest(self):
+        manifest = os.path.join(self.folder, 'manifest.csv')
+        with open(manifest, 'w') as manifestFile:
+            manifestFile.write('design,csv,action\nPart1,params.csv\n\nPart2,sub/out.csv,Export\n')
+        entries = batch.readManifest(manifest)
+        self.assertEqual(entries, [
+            batch.BatchEntry('Part1', os.path.join(self.folder, 'params.csv'), 'import'),
+            batch.BatchEntry('Part2', os.path.join(self.folder, 'sub', 'out.csv'), 'export')])
+
+if __name__ == '__main__':
+    unittest.main()
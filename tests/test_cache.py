@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from paramio import cache, csvio, validate
+from paramio.core import ParameterRow
+
+def rowsOf(count, unit='mm'):
+    return [ParameterRow('p{}'.format(index), unit, '{} {}'.format(index, unit), ' ') for index in range(count)]
+
+class TableCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.fileName = os.path.join(self.folder, 'params.csv')
+        csvio.writeParameterFile(self.fileName, rowsOf(3))
+
+    def setTime(self, fileName, seconds):
+        os.utime(fileName, ns=(seconds * 10 ** 9, seconds * 10 ** 9))
+
+    def testSameFileIsReadOnce(self):
+        tableCache = cache.TableCache()
+        first = tableCache.rows(self.fileName)
+        self.assertIs(tableCache.rows(self.fileName), first)
+        self.assertEqual(list(first), rowsOf(3))
+        self.assertEqual((tableCache.hits, tableCache.misses), (1, 1))
+
+    def testChangedFileIsReadAgain(self):
+        tableCache = cache.TableCache()
+        self.setTime(self.fileName, 1000)
+        tableCache.rows(self.fileName)
+        # the same size and a new time
+        csvio.writeParameterFile(self.fileName, rowsOf(3, 'cm'))
+        self.setTime(self.fileName, 2000)
+        self.assertEqual(list(tableCache.rows(self.fileName)), rowsOf(3, 'cm'))
+        self.assertEqual(tableCache.misses, 2)
+        self.assertEqual(tableCache.stats()['tables'], 1)
+
+    def testTouchedFileIsStillAHit(self):
+        tableCache = cache.TableCache()
+        self.setTime(self.fileName, 1000)
+        first = tableCache.rows(self.fileName)
+        self.setTime(self.fileName, 2000)
+        self.assertIs(tableCache.rows(self.fileName), first)
+        self.assertEqual(tableCache.misses, 1)
+
+    def testLeastRecentlyUsedTableIsEvicted(self):
+        tableCache = cache.TableCache(maxTables=2)
+        fileNames = []
+        for index in range(3):
+            fileName = os.path.join(self.folder, 'params{}.csv'.format(index))
+            csvio.writeParameterFile(fileName, rowsOf(index + 1))
+            fileNames.append(fileName)
+        tableCache.rows(fileNames[0])
+        tableCache.rows(fileNames[1])
+        tableCache.rows(fileNames[0])
+        tableCache.rows(fileNames[2])
+        self.assertEqual(tableCache.evictions, 1)
+        tableCache.rows(fileNames[0])
+        self.assertEqual(tableCache.misses, 3)
+        tableCache.rows(fileNames[1])
+        self.assertEqual(tableCache.misses, 4)
+
+    def testSidecarIsUsedByTheNextSession(self):
+        cache.TableCache(sidecar=True).rows(self.fileName)
+        self.assertTrue(os.path.exists(self.fileName + cache.sidecarSuffix))
+        tableCache = cache.TableCache(sidecar=True)
+        self.assertEqual(list(tableCache.rows(self.fileName)), rowsOf(3))
+        self.assertEqual(tableCache.sidecarHits, 1)
+
+        # a sidecar of another version of the file is not used
+        csvio.writeParameterFile(self.fileName, rowsOf(4))
+        tableCache = cache.TableCache(sidecar=True)
+        self.assertEqual(list(tableCache.rows(self.fileName)), rowsOf(4))
+        self.assertEqual(tableCache.sidecarHits, 0)
+
+    def testValidationReportIsCachedWithTheTable(self):
+        tableCache = cache.TableCache()
+        checked = []
+        def validateFile(fileName):
+            checked.append(fileName)
+            return validate.validateFile(fileName)
+        self.setTime(self.fileName, 1000)
+        first = tableCache.report(self.fileName, validateFile)
+        self.assertTrue(first.isValid())
+        self.assertIs(tableCache.report(self.fileName, validateFile), first)
+        # only touched, the content is the same
+        self.setTime(self.fileName, 2000)
+        self.assertIs(tableCache.report(self.fileName, validateFile), first)
+        self.assertEqual((len(checked), tableCache.reportHits), (1, 2))
+
+        with open(self.fileName, 'a') as csvFile:
+            csvFile.write('1st,mm,1 mm,\n')
+        self.assertFalse(tableCache.report(self.fileName, validateFile).isValid())
+        self.assertEqual(len(checked), 2)
+        self.assertEqual(tableCache.stats()['reports'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
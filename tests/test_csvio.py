@@ -0,0 +1,83 @@
+import codecs
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from paramio import csvio, validate
+from paramio.core import ParameterRow
+
+def tableRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'a comma, and "quotes"'),
+        ParameterRow('Höhe', 'mm', 'Width * 2', ' ')]
+
+class CsvTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def writeBytes(self, name, data):
+        with open(self.path(name), 'wb') as binaryFile:
+            binaryFile.write(data)
+        return self.path(name)
+
+    def testRowsAreStreamedAndQuoted(self):
+        # any iterable of rows, consumed one at a time
+        outputFile = io.StringIO()
+        self.assertEqual(csvio.writeParameterRows(outputFile, iter(tableRows())), 2)
+        self.assertEqual(outputFile.getvalue(),
+                         '"Width","mm","10 mm","a comma, and ""quotes"""\n"Höhe","mm","Width * 2"," "\n')
+
+    def testRoundTrip(self):
+        fileName = self.path('params.csv')
+        self.assertEqual(csvio.writeParameterFile(fileName, tableRows()), 2)
+        self.assertEqual(csvio.readParameterFile(fileName), tableRows())
+
+    def testShortRowNamesTheLine(self):
+        fileName = self.writeBytes('short.csv', b'Width,mm,10 mm\n\nHeight,mm\n')
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            csvio.readParameterFile(fileName)
+
+    def testGzipRoundTrip(self):
+        fileName = self.path('params.csv.gz')
+        self.assertEqual(csvio.writeParameterFile(fileName, tableRows()), 2)
+        with open(fileName, 'rb') as binaryFile:
+            self.assertEqual(binaryFile.read(2), b'\x1f\x8b')
+        self.assertEqual(csvio.readParameterFile(fileName), tableRows())
+
+    def testByteOrderMarks(self):
+        text = 'Width,mm,10 mm,a comma\nHöhe,mm,Width * 2\n'
+        expected = [ParameterRow('Width', 'mm', '10 mm', 'a comma'), ParameterRow('Höhe', 'mm', 'Width * 2', ' ')]
+        for name, data in [
+                ('utf8.csv', codecs.BOM_UTF8 + text.encode('utf-8')),
+                ('utf16.csv', text.encode('utf-16')),
+                ('plain.csv', text.encode('utf-8'))]:
+            self.assertEqual(csvio.readParameterFile(self.writeBytes(name, data)), expected, name)
+
+    def testFileWithoutUtf8FallsBack(self):
+        # a plain "CSV" from Excel on Windows, in cp1252 without a byte order mark
+        fileName = self.writeBytes('cp1252.csv', 'Höhe,mm,10 mm,café à 5 €\nWidth,mm,Höhe * 2\n'.encode('cp1252'))
+        self.addCleanup(setattr, csvio, 'fallbackEncoding', csvio.fallbackEncoding)
+        csvio.fallbackEncoding = 'cp1252'
+        self.assertEqual(csvio.readParameterFile(fileName), [
+            ParameterRow('Höhe', 'mm', '10 mm', 'café à 5 €'), ParameterRow('Width', 'mm', 'Höhe * 2', ' ')])
+        report = validate.validateFile(fileName)
+        self.assertTrue(report.isValid(), report.describe())
+        self.assertEqual(report.rowCount, 2)
+
+    def testTruncatedGzipRaisesOnRead(self):
+        fileName = self.path('params.csv.gz')
+        csvio.writeParameterFile(fileName, tableRows() * 100)
+        with open(fileName, 'rb') as binaryFile:
+            data = binaryFile.read()
+        fileName = self.writeBytes('truncated.csv.gz', data[:len(data) // 2])
+        with self.assertRaises(EOFError):
+            csvio.readParameterFile(fileName)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import adsk
+
+from paramio import designtable
+from paramio.core import ParameterRow
+from paramio.fusion import FusionParameterStore
+
+from test_fusion import newDesign
+
+class DesignTableFileTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.fileName = os.path.join(self.folder, 'table.csv')
+
+    def testRoundTrip(self):
+        with open(self.fileName, 'w') as tableFile:
+            tableFile.write('Name,Unit,Comment,Small,Large\nWidth,mm,,20 mm,40 mm\n\nHeight,mm,tall,Width / 2\n')
+        table = designtable.readDesignTable(self.fileName)
+        self.assertEqual(table.configurations(), ['Small', 'Large'])
+        self.assertEqual(table.rows('Large'), [ParameterRow('Width', 'mm', '40 mm', None)])
+        self.assertEqual(table.rows('Small')[1], ParameterRow('Height', 'mm', 'Width / 2', 'tall'))
+
+        table.addConfiguration('Current', [ParameterRow('Depth', 'mm', '5 mm', ' '), ParameterRow('Width', 'mm', '30 mm', ' ')])
+        designtable.writeDesignTable(self.fileName, table)
+        table = designtable.readDesignTable(self.fileName)
+        self.assertEqual(table.configurations(), ['Small', 'Large', 'Current'])
+        self.assertEqual([row.expression for row in table.rows('Current')], ['30 mm', '5 mm'])
+        self.assertEqual(table.rows('Small')[2:], [])
+
+    def testConflictingUnitIsRejected(self):
+        table = designtable.DesignTable([designtable.TableParameter('Width', 'mm', '')], [('Small', ['20 mm'])])
+        with self.assertRaises(ValueError):
+            table.addConfiguration('Other', [ParameterRow('Width', 'in', '1 in', ' ')])
+        with self.assertRaises(ValueError):
+            table.addConfiguration('Small', [ParameterRow('Width', 'mm', '1 mm', ' ')])
+
+    def testHeaderIsRequired(self):
+        with open(self.fileName, 'w') as tableFile:
+            tableFile.write('Width,mm,20 mm\n')
+        with self.assertRaises(ValueError):
+            designtable.readDesignTable(self.fileName)
+
+class DesignTableTest(unittest.TestCase):
+    def setUp(self):
+        self.design = newDesign()
+        self.store = FusionParameterStore(self.design)
+        adsk.resetStats()
+
+    def table(self, comment):
+        parameters = [designtable.TableParameter('Width', 'mm', comment), designtable.TableParameter('Height', 'mm', '')]
+        return designtable.DesignTable(parameters, [
+            ('small', ['10 mm', '20 mm']), ('wide', ['40 mm', '']), ('tall', ['', '80 mm'])])
+
+    def testParametersAreReadOnceForAllConfigurations(self):
+        results = designtable.regenerate(self.store, self.table(''))
+        self.assertEqual([result.error for result in results], [None, None, None])
+        self.assertEqual(adsk.stats['ParameterList.item'], len(self.design._params))
+        self.assertEqual(adsk.stats['recompute'], 2)
+        self.assertEqual(self.store.snapshot()['Width'].expression, '40 mm')
+        self.assertEqual(self.store.snapshot()['Height'].expression, '80 mm')
+
+    def testEmptyCommentKeepsTheComments(self):
+        designtable.regenerate(self.store, self.table(''))
+        self.assertEqual(adsk.stats['Parameter.comment.set'], 0)
+        self.store.refresh()
+        self.assertEqual(self.store.snapshot()['Width'].comment, 'the width')
+        self.assertEqual(self.store.snapshot()['Height'].comment, 'the height')
+
+    def testCommentInTheTableIsApplied(self):
+        designtable.regenerate(self.store, self.table('from the table'), ['wide'])
+        self.store.refresh()
+        self.assertEqual(self.store.snapshot()['Width'].comment, 'from the table')
+        self.assertEqual(self.store.snapshot()['Height'].comment, 'the height')
+
+if __name__ == '__main__':
+    unittest.main()
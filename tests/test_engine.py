@@ -0,0 +1,152 @@
+import pickle
+import unittest
+
+from paramio import core, engine
+from paramio.core import ParameterRow
+from paramio.store import MemoryParameterStore
+
+class RecordingStore(MemoryParameterStore):
+    # counts the batches and fails the first add or update of the names it is
+    # given, so the rollback can restore them
+    def __init__(self, rows, failAdd=(), failUpdate=(), failRemove=False):
+        super().__init__(rows)
+        self.failAdd = set(failAdd)
+        self.failUpdate = set(failUpdate)
+        self.failRemove = failRemove
+        self.batches = 0
+        self.openBatches = 0
+
+    def beginBatch(self):
+        self.batches += 1
+        self.openBatches += 1
+
+    def endBatch(self):
+        self.openBatches -= 1
+
+    def addParameter(self, row):
+        if row.name in self.failAdd:
+            self.failAdd.remove(row.name)
+            raise RuntimeError('cannot add ' + row.name)
+        super().addParameter(row)
+
+    def updateParameter(self, row, fields):
+        if row.name in self.failUpdate:
+            self.failUpdate.remove(row.name)
+            # like Fusion, the unit is already set when the expression fails
+            if 'unit' in fields:
+                super().updateParameter(row, ('unit',))
+            raise RuntimeError('cannot update ' + row.name)
+        super().updateParameter(row, fields)
+
+    def removeParameter(self, name):
+        if self.failRemove:
+            raise RuntimeError('cannot remove ' + name)
+        super().removeParameter(name)
+
+def originalRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'the width'),
+        ParameterRow('Height', 'mm', '20 mm', 'the height'),
+        ParameterRow('Angle', 'deg', '30 deg', ' ')]
+
+class ApplyChangesTest(unittest.TestCase):
+    def importRows(self, store, rows):
+        changes = engine.planImport(store, rows)
+        return engine.applyChanges(store, changes, deferCompute=True)
+
+    def testFailingAddRestoresEveryFieldInOneBatch(self):
+        store = RecordingStore(originalRows(), failAdd=('Depth',))
+        rows = [
+            ParameterRow('Width', 'in', '1 in', 'changed'),
+            ParameterRow('Length', 'mm', '5 mm', ' '),
+            ParameterRow('Depth', 'mm', '7 mm', ' ')]
+        with self.assertRaises(engine.ImportFailed) as raised:
+            self.importRows(store, rows)
+        self.assertEqual(raised.exception.row.name, 'Depth')
+        self.assertIsNone(raised.exception.rollbackError)
+        self.assertEqual(list(store.rows()), originalRows())
+        self.assertEqual(store.batches, 1)
+        self.assertEqual(store.openBatches, 0)
+
+    def testFailingUpdateRestoresEveryField(self):
+        store = RecordingStore(originalRows(), failUpdate=('Height',))
+        rows = [
+            ParameterRow('Width', 'mm', '11 mm', 'the width'),
+            ParameterRow('Height', 'in', '2 in', 'changed')]
+        with self.assertRaises(engine.ImportFailed):
+            self.importRows(store, rows)
+        self.assertEqual(list(store.rows()), originalRows())
+        self.assertEqual(store.batches, 1)
+        self.assertEqual(store.openBatches, 0)
+
+    def testFailedRollbackIsReported(self):
+        store = RecordingStore(originalRows(), failAdd=('Depth',), failRemove=True)
+        rows = [ParameterRow('Length', 'mm', '5 mm', ' '), ParameterRow('Depth', 'mm', '7 mm', ' ')]
+        with self.assertRaises(engine.ImportFailed) as raised:
+            self.importRows(store, rows)
+        self.assertIsInstance(raised.exception.rollbackError, RuntimeError)
+        self.assertIn('Restoring the parameters failed too', str(raised.exception))
+        self.assertEqual(store.openBatches, 0)
+
+    def testRecomputesAvoided(self):
+        store = RecordingStore(originalRows())
+        rows = [
+            ParameterRow('Width', 'mm', '11 mm', 'the width'),
+            ParameterRow('Height', 'mm', '21 mm', 'a new comment'),
+            ParameterRow('Length', 'mm', '5 mm', ' ')]
+        # the comment change does not make the model recompute
+        self.assertEqual(self.importRows(store, rows), 2)
+
+    def testUnchangedImportEditsNothing(self):
+        store = RecordingStore(originalRows(), failAdd=('Width', 'Height', 'Angle'), failUpdate=('Width', 'Height', 'Angle'))
+        changes = engine.planImport(store, originalRows())
+        self.assertTrue(changes.isEmpty())
+        self.assertEqual(changes.unchanged, ['Width', 'Height', 'Angle'])
+        engine.applyChanges(store, changes)
+
+class DependencyOrderTest(unittest.TestCase):
+    def testParametersAreAppliedAfterTheOnesTheyUse(self):
+        store = MemoryParameterStore(originalRows())
+        rows = [
+            ParameterRow('Width', 'mm', 'Length * 2', ' '),
+            ParameterRow('Area', 'mm^2', 'Length * Depth', ' '),
+            ParameterRow('Length', 'mm', 'Depth + 1 mm', ' '),
+            ParameterRow('Depth', 'mm', '3 mm', ' ')]
+        changes = engine.planImport(store, rows)
+        order = [row.name for row, fields in changes.inApplyOrder()]
+        for used, user in [('Depth', 'Length'), ('Length', 'Width'), ('Length', 'Area'), ('Depth', 'Area')]:
+            self.assertLess(order.index(used), order.index(user))
+        engine.applyChanges(store, changes)
+        self.assertEqual(store.snapshot()['Width'].expression, 'Length * 2')
+
+    def testCycleIsFoundBeforeAnythingChanges(self):
+        store = RecordingStore(originalRows())
+        rows = [
+            ParameterRow('Width', 'mm', 'Length + 1 mm', ' '),
+            ParameterRow('Length', 'mm', 'Depth', ' '),
+            ParameterRow('Depth', 'mm', 'Width', ' ')]
+        with self.assertRaises(core.DependencyCycleError) as raised:
+            engine.planImport(store, rows)
+        cycle = raised.exception.cycle
+        self.assertEqual(cycle[0], cycle[-1])
+        self.assertEqual(set(cycle), {'Width', 'Length', 'Depth'})
+        self.assertEqual(list(store.rows()), originalRows())
+        self.assertEqual(store.batches, 0)
+
+    def testCycleErrorSurvivesPickling(self):
+        # planFiles gets it back from a worker process
+        error = pickle.loads(pickle.dumps(core.DependencyCycleError(['a', 'b', 'a'])))
+        self.assertEqual(error.cycle, ['a', 'b', 'a'])
+        self.assertEqual(str(error), 'Parameters reference each other in a cycle: a -> b -> a')
+
+    def testLastDuplicateRowWins(self):
+        changes = core.computeChangeSet({}, [ParameterRow('a', 'mm', '1 mm', ' '), ParameterRow('a', 'mm', '2 mm', ' ')])
+        self.assertEqual([row.expression for row in changes.added], ['2 mm'])
+
+    def testCommentNoneLeavesTheComment(self):
+        existing = ParameterRow('a', 'mm', '1 mm', 'kept')
+        self.assertEqual(core.changedFields(existing, ParameterRow('a', 'mm', '2 mm', None)), ('expression',))
+        self.assertEqual(core.changedFields(existing, ParameterRow('a', 'mm', '1 mm', None)), ())
+
+if __name__ == '__main__':
+    unittest.main()
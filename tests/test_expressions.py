@@ -0,0 +1,78 @@
+import math
+import unittest
+
+from paramio import expressions, units
+
+def quantities(**values):
+    # lookup for parameters given as (value in base units, dimensions)
+    return lambda name: expressions.Quantity(*values[name]) if name in values else None
+
+class ParseTest(unittest.TestCase):
+    def testUnitBelongsToTheNumberBeforeIt(self):
+        self.assertEqual(expressions.parse('Width / 2 mm'),
+                         ('binary', '/', ('name', 'Width'), ('binary', '*', ('number', 2.0), ('name', 'mm'))))
+        self.assertEqual(expressions.parse('5 mm^2'),
+                         ('binary', '*', ('number', 5.0), ('binary', '^', ('name', 'mm'), ('number', 2.0))))
+        self.assertEqual(expressions.parse('-1e3 mm'),
+                         ('negate', ('binary', '*', ('number', 1000.0), ('name', 'mm'))))
+
+    def testPrecedence(self):
+        self.assertEqual(expressions.parse('1 + 2 * 3 ^ 2'),
+                         ('binary', '+', ('number', 1.0), ('binary', '*', ('number', 2.0),
+                                                            ('binary', '^', ('number', 3.0), ('number', 2.0)))))
+        self.assertEqual(expressions.parse('(1 + 2) mm'),
+                         ('binary', '*', ('binary', '+', ('number', 1.0), ('number', 2.0)), ('name', 'mm')))
+
+    def testCallsAndText(self):
+        self.assertEqual(expressions.parse('max(1 mm, Width)'),
+                         ('call', 'max', [('binary', '*', ('number', 1.0), ('name', 'mm')), ('name', 'Width')]))
+        self.assertEqual(expressions.parse("'text'"), ('string', 'text'))
+
+    def testSyntaxErrors(self):
+        for expression in ('', '1 +', '(1 mm', '1 mm)', '1 $ 2', 'max(1,'):
+            with self.assertRaises(expressions.ExpressionError, msg=expression):
+                expressions.parse(expression)
+
+    def testReferencedNames(self):
+        self.assertEqual(expressions.referencedNames('Width * 2 mm + Height / Width + 1e3', {'Width', 'Height', 'e3'}),
+                         ['Width', 'Height'])
+
+class EvaluateTest(unittest.TestCase):
+    def assertQuantity(self, quantity, value, dims):
+        self.assertAlmostEqual(quantity.value, value)
+        self.assertEqual(quantity.dims, dims)
+
+    def testRatioOfLengthsIsUnitless(self):
+        self.assertQuantity(expressions.evaluateParameter('10 mm / 2 mm', ''), 5.0, units.DIMENSIONLESS)
+        lookup = quantities(Width=(0.01, units.LENGTH))
+        self.assertQuantity(expressions.evaluateParameter('Width / 2 mm', '', lookup), 5.0, units.DIMENSIONLESS)
+        self.assertQuantity(expressions.evaluateParameter('Width / 2', 'mm', lookup), 0.005, units.LENGTH)
+
+    def testBareNumbersTakeTheUnit(self):
+        self.assertQuantity(expressions.evaluateParameter('10', 'in'), 0.254, units.LENGTH)
+        self.assertQuantity(expressions.evaluateParameter('1 in + 1', 'mm'), 0.0264, units.LENGTH)
+        self.assertQuantity(expressions.evaluateParameter('5 mm^2', 'mm^2'), 5e-6, (2, 0, 0, 0))
+
+    def testFunctions(self):
+        self.assertQuantity(expressions.evaluateParameter('sin(30)', ''), 0.5, units.DIMENSIONLESS)
+        self.assertQuantity(expressions.evaluateParameter('asin(1)', 'deg'), math.pi / 2, units.ANGLE)
+        self.assertQuantity(expressions.evaluateParameter('sqrt(4 mm^2)', 'mm'), 0.002, units.LENGTH)
+        self.assertQuantity(expressions.evaluateParameter('round(1.6 mm)', 'mm'), 0.002, units.LENGTH)
+        self.assertQuantity(expressions.evaluateParameter('max(1 mm, 2 mm, 1 in)', 'mm'), 0.0254, units.LENGTH)
+
+    def testUnitConflicts(self):
+        for expression, unit in [('10 mm', 'deg'), ('1 mm + 1 deg', 'mm'), ('sqrt(1 mm)', 'mm'), ('sin(1 mm)', '')]:
+            with self.assertRaises(expressions.UnitConflict, msg=expression):
+                expressions.evaluateParameter(expression, unit)
+        with self.assertRaises(expressions.UnitConflict):
+            expressions.unitQuantity('furlong')
+
+    def testUnsupported(self):
+        for expression in ("'text'", 'foo(1)'):
+            with self.assertRaises(expressions.UnsupportedExpression, msg=expression):
+                expressions.evaluateParameter(expression, '')
+        with self.assertRaises(expressions.ExpressionError):
+            expressions.evaluateParameter('Missing * 2', 'mm')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import adsk
+import adsk.fusion
+
+from paramio import engine
+from paramio.core import ParameterRow
+from paramio.fusion import FusionParameterStore
+
+def newDesign():
+    design = adsk.fusion.Design()
+    design.addParameter('Width', 'mm', '10 mm', 'the width')
+    design.addParameter('Height', 'mm', '20 mm', 'the height')
+    design.addParameter('Angle', 'deg', '30 deg', '')
+    design.addParameter('d1', 'mm', 'Width / 2', '', isUser=False)
+    return design
+
+class FusionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.design = newDesign()
+        self.store = FusionParameterStore(self.design)
+        self.original = list(self.store.rows())
+        adsk.resetStats()
+
+    def importRows(self, rows):
+        return engine.applyChanges(self.store, engine.planImport(self.store, rows))
+
+    def testFailingUpdateRestoresEveryFieldInOneRecompute(self):
+        # Fusion takes the new unit, then rejects the empty expression
+        rows = [
+            ParameterRow('Width', 'mm', '11 mm', 'the width'),
+            ParameterRow('Height', 'in', ' ', 'changed')]
+        with self.assertRaises(engine.ImportFailed) as raised:
+            self.importRows(rows)
+        self.assertEqual(raised.exception.row.name, 'Height')
+        self.assertIsNone(raised.exception.rollbackError)
+        self.assertEqual(list(self.store.rows()), self.original)
+        self.assertEqual(adsk.stats['recompute'], 1)
+        self.assertFalse(self.design.isComputeDeferred)
+        # the index the store keeps agrees with the design
+        self.store.refresh()
+        self.assertEqual(list(self.store.snapshot().values()), self.original)
+
+    def testFailingAddRemovesTheParametersAddedBeforeIt(self):
+        rows = [
+            ParameterRow('Length', 'mm', '5 mm', 'new'),
+            ParameterRow('Depth', 'mm', '', 'no expression')]
+        with self.assertRaises(engine.ImportFailed):
+            self.importRows(rows)
+        self.assertEqual(list(self.store.rows()), self.original)
+        self.assertNotIn('Length', self.store.snapshot())
+        self.assertEqual(adsk.stats['Parameter.deleteMe'], 1)
+        self.assertEqual(adsk.stats['recompute'], 1)
+
+    def testDeferredImportRecomputesOnce(self):
+        rows = [
+            ParameterRow('Width', 'mm', '11 mm', 'the width'),
+            ParameterRow('Height', 'mm', '21 mm', 'the height'),
+            ParameterRow('Length', 'mm', 'Width + Height', ' ')]
+        self.assertEqual(self.importRows(rows), 2)
+        self.assertEqual(adsk.stats['recompute'], 1)
+        self.assertEqual(self.store.snapshot()['Length'].expression, 'Width + Height')
+
+    def testImportWithoutDeferringRecomputesEveryEdit(self):
+        rows = [ParameterRow('Width', 'mm', '11 mm', 'the width'), ParameterRow('Height', 'mm', '21 mm', 'the height')]
+        changes = engine.planImport(self.store, rows)
+        self.assertEqual(engine.applyChanges(self.store, changes, deferCompute=False), 0)
+        self.assertEqual(adsk.stats['recompute'], 2)
+
+    def testDesignIsLeftDeferredIfItWasBefore(self):
+        self.design.isComputeDeferred = True
+        self.importRows([ParameterRow('Width', 'mm', '12 mm', 'the width')])
+        self.assertTrue(self.design.isComputeDeferred)
+        self.assertEqual(adsk.stats['recompute'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from paramio import csvio, incremental
+from paramio.core import ParameterRow
+from paramio.store import MemoryParameterStore
+
+def designRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'the width'),
+        ParameterRow('Height', 'mm', '20 mm', ' '),
+        ParameterRow('Angle', 'deg', '30 deg', ' ')]
+
+def readTable(fileName):
+    with csvio.openText(fileName) as csvFile:
+        return list(csv.reader(csvFile, dialect=csv.excel))
+
+class IncrementalExportTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.fileName = os.path.join(self.folder, 'params.csv')
+        self.exporter = incremental.IncrementalExporter()
+
+    def testUnchangedDesignWritesNothing(self):
+        delta = self.exporter.export(MemoryParameterStore(designRows()), self.fileName)
+        self.assertTrue(delta.wrote)
+        self.assertEqual(len(delta.added), 3)
+        modified = os.stat(self.fileName).st_mtime_ns
+        delta = self.exporter.export(MemoryParameterStore(designRows()), self.fileName)
+        self.assertFalse(delta.wrote)
+        self.assertTrue(delta.isEmpty())
+        self.assertEqual(os.stat(self.fileName).st_mtime_ns, modified)
+
+    def testMergeKeepsOrderAndUserColumns(self):
+        with csvio.openText(self.fileName, 'w') as csvFile:
+            csvFile.write('Angle,deg,30 deg,,checked\nWidth,mm,9 mm,the width,by hand\nGone,mm,1 mm,,\n')
+        rows = designRows()
+        delta = self.exporter.export(MemoryParameterStore(rows), self.fileName)
+        self.assertEqual(delta.describe(), '1 added, 1 changed, 1 removed')
+        self.assertEqual(readTable(self.fileName), [
+            ['Angle', 'deg', '30 deg', '', 'checked'],
+            ['Width', 'mm', '10 mm', 'the width', 'by hand'],
+            ['Height', 'mm', '20 mm', ' ']])
+
+    def testFileChangedOutsideIsReadAgain(self):
+        self.exporter.export(MemoryParameterStore(designRows()), self.fileName)
+        csvio.writeParameterFile(self.fileName, designRows()[:1])
+        delta = self.exporter.export(MemoryParameterStore(designRows()), self.fileName)
+        self.assertEqual([row.name for row in delta.added], ['Height', 'Angle'])
+        self.assertEqual(csvio.readParameterFile(self.fileName), designRows())
+
+    def testPatchAppliesLikeAMerge(self):
+        self.exporter.export(MemoryParameterStore(designRows()), self.fileName)
+        copyName = os.path.join(self.folder, 'copy.csv')
+        shutil.copy(self.fileName, copyName)
+        patchName = os.path.join(self.folder, 'params.patch.csv')
+        rows = designRows()
+        rows[0] = rows[0]._replace(expression='12 mm')
+        del rows[1]
+        rows.append(ParameterRow('Depth', 'mm', '3 mm', ' '))
+        delta = self.exporter.exportPatch(MemoryParameterStore(rows), self.fileName, patchName)
+        self.assertEqual(delta.describe(), '1 added, 1 changed, 1 removed')
+        self.assertEqual(csvio.readParameterFile(self.fileName), designRows())
+
+        incremental.applyPatch(copyName, patchName)
+        self.assertEqual(csvio.readParameterFile(copyName), [rows[0], rows[1], rows[2]])
+
+        # the patch is the new baseline
+        os.remove(patchName)
+        delta = self.exporter.exportPatch(MemoryParameterStore(rows), self.fileName, patchName)
+        self.assertFalse(delta.wrote)
+        self.assertFalse(os.path.exists(patchName))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from paramio import preview
+from paramio.core import ParameterRow
+from paramio.store import MemoryParameterStore
+
+def designRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'the width'),
+        ParameterRow('Height', 'mm', 'Width * 2', ' '),
+        ParameterRow('Label', '', "'text'", ' ')]
+
+class PreviewTest(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryParameterStore(designRows())
+
+    def preview(self, rows):
+        plan = preview.previewImport(self.store, rows)
+        # a preview never touches the parameters
+        self.assertEqual(list(self.store.rows()), designRows())
+        return plan
+
+    def testAddsAndFieldUpdates(self):
+        plan = self.preview([
+            ParameterRow('Width', 'in', '1 in', 'the width'),
+            ParameterRow('Height', 'mm', 'Width * 2', 'new comment'),
+            ParameterRow('Depth', 'mm', 'Width / 2 mm * 1 mm', ' ')])
+        self.assertTrue(plan.isValid())
+        self.assertEqual([row.name for row in plan.adds], ['Depth'])
+        self.assertEqual([row.name for row, fields in plan.updates], ['Width', 'Height'])
+        self.assertEqual(plan.fieldChanges, [
+            ('Width', 'unit', 'mm', 'in'),
+            ('Width', 'expression', '10 mm', '1 in'),
+            ('Height', 'comment', ' ', 'new comment')])
+        self.assertAlmostEqual(plan.values['Width'].value, 0.0254)
+        self.assertAlmostEqual(plan.values['Depth'].value, 0.0127)
+        self.assertEqual(plan.problems(), [])
+
+    def testUnitConflicts(self):
+        plan = self.preview([
+            ParameterRow('Width', 'deg', '10 mm', ' '),
+            ParameterRow('Depth', 'furlongs', '1', ' ')])
+        self.assertFalse(plan.isValid())
+        self.assertEqual(sorted(name for name, message in plan.unitConflicts), ['Depth', 'Width'])
+        self.assertIn('Width: the expression evaluates to length', plan.describe())
+
+    def testExpressionErrors(self):
+        plan = self.preview([
+            ParameterRow('Width', 'mm', '10 mm +', ' '),
+            ParameterRow('Depth', 'mm', 'Missing * 2', ' '),
+            ParameterRow('Zero', '', '1 / 0', ' ')])
+        self.assertFalse(plan.isValid())
+        self.assertEqual(sorted(name for name, message in plan.expressionErrors), ['Depth', 'Width', 'Zero'])
+        # Height uses the broken Width, it is not changed so it is not reported
+        self.assertEqual(plan.unchecked, [])
+
+    def testUncheckedExpressionsDoNotFailThePlan(self):
+        plan = self.preview([
+            ParameterRow('Label', '', "'other text'", ' '),
+            ParameterRow('Count', '', 'foo(2)', ' '),
+            ParameterRow('Twice', '', 'Count * 2', ' ')])
+        self.assertTrue(plan.isValid())
+        unchecked = dict(plan.unchecked)
+        self.assertEqual(sorted(unchecked), ['Count', 'Label', 'Twice'])
+        self.assertIn('unknown function foo', unchecked['Count'])
+        self.assertEqual(unchecked['Twice'], 'uses Count which could not be evaluated')
+
+    def testCycle(self):
+        plan = self.preview([
+            ParameterRow('Width', 'mm', 'Height / 2', ' '),
+            ParameterRow('Depth', 'mm', '1 mm', ' ')])
+        self.assertFalse(plan.isValid())
+        self.assertEqual(set(plan.cycle.cycle), {'Width', 'Height'})
+        self.assertEqual(plan.problems(), [str(plan.cycle)])
+        self.assertEqual(plan.values, {})
+
+    def testDescribeLimitsTheProblems(self):
+        rows = [ParameterRow('p{}'.format(index), 'mm', '1 deg', ' ') for index in range(5)]
+        plan = self.preview(rows)
+        lines = plan.describe(maxProblems=2).splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[-1], '... and 3 more problems')
+
+if __name__ == '__main__':
+    unittest.main()
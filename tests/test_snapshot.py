@@ -0,0 +1,76 @@
+import math
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+
+from paramio import csvio, snapshot
+from paramio.core import ParameterRow
+
+def tableRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'the width'),
+        ParameterRow('Height', 'mm', 'Width * 2', ' '),
+        ParameterRow('Angle', 'deg', '90 deg', 'ÜBER, "quoted"'),
+        ParameterRow('Count', '', '3', ' '),
+        ParameterRow('Broken', 'mm', 'Missing + 1 mm', ' ')]
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def testCsvRoundTrip(self):
+        csvName = os.path.join(self.folder, 'params.csv')
+        snapshotName = os.path.join(self.folder, 'params.psnap')
+        copyName = os.path.join(self.folder, 'copy.csv')
+        csvio.writeParameterFile(csvName, tableRows())
+        self.assertEqual(snapshot.csvToSnapshot(csvName, snapshotName), 5)
+        self.assertEqual(snapshot.readSnapshotRows(snapshotName), tableRows())
+        self.assertEqual(snapshot.snapshotToCsv(snapshotName, copyName), 5)
+        self.assertEqual(csvio.readParameterFile(copyName), tableRows())
+
+    def testValuesAndFlags(self):
+        snapshotName = os.path.join(self.folder, 'params.psnap')
+        records = list(snapshot.recordsFromRows(tableRows()))
+        records[0] = records[0]._replace(isFavorite=True)
+        records[1] = records[1]._replace(isUser=False)
+        snapshot.writeSnapshotFile(snapshotName, records)
+        with snapshot.SnapshotReader(snapshotName) as reader:
+            self.assertEqual(len(reader), 5)
+            self.assertAlmostEqual(reader.value(reader.index('Width')), 0.01)
+            self.assertAlmostEqual(reader.value(reader.index('Height')), 0.02)
+            self.assertAlmostEqual(reader.value(reader.index('Angle')), math.pi / 2)
+            self.assertEqual(reader.value(reader.index('Count')), 3)
+            self.assertTrue(math.isnan(reader.value(reader.index('Broken'))))
+            # NaN is not equal to itself, Broken is compared without its value
+            self.assertEqual(list(reader.records())[:4], records[:4])
+            self.assertEqual(reader.record(4)._replace(value=None), records[4]._replace(value=None))
+            self.assertEqual(reader.values().tolist()[:2], [record.value for record in records[:2]])
+
+    def testBigEndianWriterAndReaderAgree(self):
+        # on this machine the writer then swaps the numbers away from the
+        # native order and the reader has to swap them back
+        self.addCleanup(setattr, snapshot, 'sys', snapshot.sys)
+        snapshot.sys = types.SimpleNamespace(byteorder='big' if sys.byteorder == 'little' else 'little')
+        snapshotName = os.path.join(self.folder, 'params.psnap')
+        records = list(snapshot.recordsFromRows(tableRows()))
+        snapshot.writeSnapshotFile(snapshotName, records)
+        with snapshot.SnapshotReader(snapshotName) as reader:
+            self.assertEqual(list(reader.rows()), tableRows())
+            self.assertEqual(reader.unit(reader.index('Angle')), 'deg')
+            self.assertEqual(reader.values().tolist()[:4], [record.value for record in records[:4]])
+
+    def testOtherFilesAreRejected(self):
+        csvName = os.path.join(self.folder, 'params.csv')
+        csvio.writeParameterFile(csvName, tableRows())
+        emptyName = os.path.join(self.folder, 'empty.psnap')
+        open(emptyName, 'wb').close()
+        for fileName in (csvName, emptyName):
+            with self.assertRaises(ValueError):
+                snapshot.SnapshotReader(fileName)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from paramio import core, csvio, engine
+from paramio.core import ParameterRow
+from paramio.store import MemoryParameterStore
+
+def designRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', 'the width'),
+        ParameterRow('Height', 'mm', 'Width * 2', ' ')]
+
+class HeadlessEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def testEngineDoesNotNeedFusion(self):
+        code = 'import sys, paramio.engine, paramio.batch, paramio.validate; sys.exit("adsk" in sys.modules)'
+        repoDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(subprocess.call([sys.executable, '-c', code], cwd=repoDir), 0)
+
+    def testExportAndImportFile(self):
+        fileName = self.path('params.csv')
+        self.assertEqual(engine.exportFile(MemoryParameterStore(designRows()), fileName), 2)
+
+        store = MemoryParameterStore([ParameterRow('Width', 'mm', '12 mm', 'the width')])
+        changes, recomputesAvoided = engine.importFile(store, fileName)
+        self.assertEqual([row.name for row in changes.added], ['Height'])
+        self.assertEqual([row.name for row, fields in changes.modified], ['Width'])
+        self.assertEqual(recomputesAvoided, 1)
+        self.assertEqual(list(store.rows()), designRows())
+
+    def testMemoryStoreRejectsDuplicates(self):
+        store = MemoryParameterStore(designRows())
+        with self.assertRaises(ValueError):
+            store.addParameter(ParameterRow('Width', 'mm', '1 mm', ' '))
+
+    def testPlanFilesInProcesses(self):
+        good = self.path('good.csv')
+        cycle = self.path('cycle.csv')
+        csvio.writeParameterFile(good, [ParameterRow('Width', 'mm', '11 mm', 'the width')])
+        csvio.writeParameterFile(cycle, [ParameterRow('Width', 'mm', 'Height', ' ')])
+        results = engine.planFiles(designRows(), [good, cycle, self.path('missing.csv')], maxWorkers=2)
+        self.assertEqual([row.expression for row, fields in results[good].modified], ['11 mm'])
+        self.assertIsInstance(results[cycle], core.DependencyCycleError)
+        self.assertIsInstance(results[self.path('missing.csv')], FileNotFoundError)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from paramio import validate
+
+lines = [
+    'Width,mm,10 mm,the width',
+    'Height,mm,Width * 2',
+    '1st,mm,1 mm',
+    'Width,mm,11 mm',
+    'Depth,furlongs,1',
+    'Angle,deg,',
+    'Bad,mm,10 mm +',
+    'Short,mm',
+    'mm,mm,1 mm',
+    '',
+    '"Quoted\nName",mm,1 mm',
+    'Last,mm,2 * Width']
+
+class ValidateTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.fileName = os.path.join(self.folder, 'params.csv')
+        with open(self.fileName, 'w', newline='') as csvFile:
+            csvFile.write('\n'.join(lines) + '\n')
+
+    def testProblemsAreFoundOnTheirLines(self):
+        report = validate.validateFile(self.fileName, maxWorkers=0)
+        self.assertFalse(report.isValid())
+        self.assertEqual(report.rowCount, 11)
+        self.assertEqual([(problem.line, problem.name) for problem in report.problems], [
+            (3, '1st'), (4, 'Width'), (5, 'Depth'), (6, 'Angle'), (7, 'Bad'), (8, 'Short'), (9, 'mm'), (11, 'Quoted\nName')])
+        self.assertIn('already on line 1', report.problems[1].message)
+        # a unit that is not known is only a warning
+        self.assertEqual([problem.name for problem in report.problems if problem.isWarning], ['Depth'])
+        self.assertEqual((report.problemCount, report.warningCount), (7, 1))
+
+    def testUnknownUnitsDoNotFailTheFile(self):
+        with open(self.fileName, 'w') as csvFile:
+            csvFile.write('F,N,10 N\nP,psi,F / 1 in^2\nT,min,2\nS,furlongs,3 furlongs\n')
+        report = validate.validateFile(self.fileName, maxWorkers=0)
+        self.assertTrue(report.isValid())
+        self.assertEqual(report.warningCount, 1)
+        self.assertEqual(report.describe().splitlines(), [
+            '4 rows checked, no problems found, 1 warnings',
+            "line 4: warning: unknown unit 'furlongs', it is not checked"])
+
+    def testPoolFindsTheSameProblems(self):
+        inProcess = validate.validateFile(self.fileName, maxWorkers=0, chunkRows=3)
+        pooled = validate.validateFile(self.fileName, maxWorkers=2, chunkRows=3)
+        self.assertEqual(pooled.problems, inProcess.problems)
+        self.assertEqual(pooled.rowCount, inProcess.rowCount)
+
+    def testReportFileHasEveryProblem(self):
+        reportName = os.path.join(self.folder, 'problems.csv')
+        report = validate.validateFile(self.fileName, maxWorkers=0, maxProblems=2, reportFileName=reportName)
+        self.assertEqual(len(report.problems), 2)
+        self.assertEqual(report.problemCount + report.warningCount, 8)
+        self.assertIn('... and 6 more problems', report.describe(maxProblems=2))
+        with open(reportName) as reportFile:
+            self.assertEqual(len(reportFile.read().splitlines()), 1 + 8 + 1)
+
+        # a report left from an earlier check goes once the file is fixed
+        with open(self.fileName, 'w') as csvFile:
+            csvFile.write('Width,mm,10 mm\n')
+        self.assertTrue(validate.validateFile(self.fileName, maxWorkers=0, reportFileName=reportName).isValid())
+        self.assertFalse(os.path.exists(reportName))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from paramio import variants
+from paramio.core import ParameterRow
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def tableRows():
+    return [
+        ParameterRow('Width', 'mm', '10 mm', ' '),
+        ParameterRow('Height', 'mm', 'Width * 2', ' '),
+        ParameterRow('Depth', 'mm', '5 mm', ' ')]
+
+def variantTable():
+    return variants.VariantTable(['small', 'wide', 'default'], {
+        'Width': ['10 mm', '40 mm', ''],
+        'Height': ['', 'Width / 2', '30 mm']})
+
+class VariantRowsTest(unittest.TestCase):
+    def testEmptyCellKeepsTheExpression(self):
+        self.assertEqual([row.expression for row in variants.variantRows(tableRows(), variantTable(), 2)],
+                         ['10 mm', '30 mm', '5 mm'])
+        self.assertEqual([row.expression for row in variants.variantRows(tableRows(), variantTable(), 0)],
+                         ['10 mm', 'Width * 2', '5 mm'])
+
+@unittest.skipUnless(numpy, 'evaluating variants needs NumPy')
+class EvaluateVariantsTest(unittest.TestCase):
+    def testEveryVariantIsEvaluated(self):
+        result = variants.evaluateVariants(tableRows(), variantTable())
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.valuesIn('Width').tolist(), [10, 40, 10])
+        self.assertEqual(result.valuesIn('Height').tolist(), [20, 20, 30])
+        self.assertEqual(result.valuesIn('Depth', 'cm').tolist(), [0.5, 0.5, 0.5])
+
+    def testBadCellOnlyFailsItsVariant(self):
+        table = variants.VariantTable(['good', 'bad'], {'Width': ['12 mm', '3 mm *']})
+        result = variants.evaluateVariants(tableRows(), table)
+        width = result.valuesIn('Width')
+        self.assertEqual(width[0], 12)
+        self.assertTrue(numpy.isnan(width[1]))
+        self.assertIn('Width', result.cellErrors)
+
+    def testParametersUsingAFailedOneFailToo(self):
+        table = variants.VariantTable(['bad', 'worse'], {'Width': ['3 mm *', '1 deg']})
+        result = variants.evaluateVariants(tableRows(), table)
+        self.assertEqual(sorted(result.errors), ['Height', 'Width'])
+        self.assertEqual(result.errors['Height'], 'uses Width which could not be evaluated')
+        self.assertTrue(numpy.isnan(result.valuesIn('Height')).all())
+        self.assertEqual(result.valuesIn('Depth').tolist(), [5, 5])
+
+    def testUnknownParameterIsRejected(self):
+        with self.assertRaises(ValueError):
+            variants.evaluateVariants(tableRows(), variants.VariantTable(['a'], {'Length': ['1 mm']}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import queue
+import shutil
+import tempfile
+import time
+import unittest
+
+from paramio import csvio, watcher
+from paramio.core import ParameterRow
+
+designRows = [ParameterRow('Width', 'mm', '10 mm', ' ')]
+editedRows = [ParameterRow('Width', 'mm', '20 mm', ' '), ParameterRow('Depth', 'mm', '5 mm', ' ')]
+
+class ParameterSyncTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.fileName = os.path.join(folder, 'params.csv')
+        self.posted = queue.Queue()
+
+    def startSync(self, rows=None):
+        # rows are in the file when the sync starts, like after an import or export
+        if rows is not None:
+            csvio.writeParameterFile(self.fileName, rows)
+        self.sync = watcher.ParameterSync(self.fileName, self.posted.put, debounce=0.05, minImportInterval=0.0, pollInterval=0.02)
+        self.sync.start()
+        self.addCleanup(self.sync.stop)
+
+    def nextPost(self):
+        return self.posted.get(timeout=5.0)
+
+    def assertNothingPosted(self):
+        time.sleep(0.3)
+        self.assertTrue(self.posted.empty())
+
+    def waitFor(self, condition):
+        deadline = time.monotonic() + 5.0
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def testChangesAreExported(self):
+        self.startSync()
+        self.sync.markDirty()
+        self.sync.markDirty()
+        self.assertEqual(self.nextPost(), 'export')
+        self.sync.exportRows(designRows)
+        self.waitFor(lambda: self.sync.exports == 1)
+        self.assertEqual(csvio.readParameterFile(self.fileName), designRows)
+        # the export is not mistaken for a change to import
+        self.assertNothingPosted()
+
+    def testFailedExportIsAskedForAgain(self):
+        self.startSync()
+        self.sync.markDirty()
+        self.assertEqual(self.nextPost(), 'export')
+        # without exportFailed the sync would wait for these rows forever
+        self.sync.exportFailed()
+        self.sync.markDirty()
+        self.assertEqual(self.nextPost(), 'export')
+
+    def testOutsideChangeIsImported(self):
+        self.startSync(designRows)
+        csvio.writeParameterFile(self.fileName, editedRows)
+        self.assertEqual(self.nextPost(), 'import')
+        self.sync.importDone()
+        self.assertNothingPosted()
+
+    def testRowsArrivingAfterAnOutsideChangeAreNotWritten(self):
+        self.startSync(designRows)
+        self.sync.markDirty()
+        self.assertEqual(self.nextPost(), 'export')
+        csvio.writeParameterFile(self.fileName, editedRows)
+        self.sync.exportRows(designRows)
+        self.assertEqual(self.nextPost(), 'import')
+        self.assertEqual(csvio.readParameterFile(self.fileName), editedRows)
+        self.assertEqual((self.sync.exports, self.sync.conflicts), (0, 1))
+
+        # once the file is imported the design is exported again
+        self.sync.importDone()
+        self.assertEqual(self.nextPost(), 'export')
+        self.sync.exportRows(editedRows + [ParameterRow('Angle', 'deg', '30 deg', ' ')])
+        self.waitFor(lambda: self.sync.exports == 1)
+        self.assertEqual(csvio.readParameterFile(self.fileName)[:2], editedRows)
+
+    def testNothingIsExportedOverARefusedFile(self):
+        self.startSync(designRows)
+        csvio.writeParameterFile(self.fileName, editedRows)
+        self.assertEqual(self.nextPost(), 'import')
+        # a change in the design waits for the import
+        self.sync.markDirty()
+        self.assertNothingPosted()
+        self.sync.importDone(imported=False)
+        self.assertNothingPosted()
+
+        # the user fixes the file
+        csvio.writeParameterFile(self.fileName, editedRows + [ParameterRow('Angle', 'deg', '30 deg', ' ')])
+        self.assertEqual(self.nextPost(), 'import')
+        self.sync.importDone()
+        self.assertEqual(self.nextPost(), 'export')
+
+    def testDeletedFileIsWrittenAgain(self):
+        self.startSync(designRows)
+        os.remove(self.fileName)
+        self.sync.markDirty()
+        self.assertEqual(self.nextPost(), 'export')
+        self.sync.exportRows(designRows)
+        self.waitFor(lambda: self.sync.exports == 1)
+        self.assertEqual(csvio.readParameterFile(self.fileName), designRows)
+
+if __name__ == '__main__':
+    unittest.main()